@@ -1,14 +1,106 @@
-from .cross_section import *
-from .mylib import *
-from .spacer import *
-from .beams import *
-from .resonators import *
-from .truss import *
-from .springs import *
-from .utils import *
-from .actuation import *
-from .basic_geometry import *
-from .taper import *
-from .path import *
-
-from .test_blocks import *
\ No newline at end of file
+"""Layout blocks, loaded lazily.
+
+`from blocks import truss_v2` only imports blocks.truss and the modules it depends
+on. _EXPORTS lists the public names every module adds, in the order of the star
+imports the package used to do, so it exports the same names; a name sits under
+the first module that binds the object the star imports ended up with.
+tests/test_blocks_package.py checks the table against the modules.
+`from blocks import *` still loads everything.
+"""
+import importlib
+import sys
+import types
+
+_EXPORTS = {
+    "pdk": (
+        "activate_noems_pdk", "functools", "get_noems_pdk", "gf", "LAYER", "Layer", "LayerMap", "noems_layer",
+        "NOEMS_LayerMap", "NOEMS_LAYERS",
+    ),
+    "cross_section": ("cross_section_with_mask", "cross_section_with_sleeves"),
+    "mylib": (
+        "adiabatic_resonator", "big_mark_set", "die_with_alignment_marks", "etch_depth_square", "frame", "l_corner",
+        "Literal", "math", "my_coupler", "np", "pathlib", "ring_resonator", "ruler_mark", "ruler_set",
+        "small_mark_set", "stamped_mark_set", "text_glyph", "text_glyph_placements", "text_outline",
+        "waveguide_inv_extrude",
+    ),
+    "spacer": ("vertical_spacer",),
+    "beams": (
+        "cantilever_beam", "cantilever_beam_with_round_support", "create_deep_etch_mask", "doubly_clamped_beam",
+        "doubly_clamped_beam_with_round_support", "doubly_clamped_beam_with_spring", "LayerSpec",
+        "merge_deep_etch_mask", "Sequence", "smooth_asymmetric",
+    ),
+    "resonators": ("partial", "resonator_with_beam"),
+    "truss": ("truss", "truss_v2"),
+    "springs": ("ceil", "spring_anchor_outside", "spring_pair", "spring_pair_anchor_outside", "spring_with_truss"),
+    "utils": (
+        "Callable", "labelme", "labelme_batch", "merge_layers_with_priority", "tmp_merge_deep_etch_mask", "Union",
+    ),
+    "actuation": ("combdrive_estimate", "combdrive_finger_outlines", "combdrive_fingers", "EPSILON_0", "floor"),
+    "mechanics": (
+        "add_spring_info", "component_mass", "DENSITY_SI", "folded_spring_5um_stiffness", "guided_beam_stiffness",
+        "resonance_frequency", "spring_5um_stiffness", "spring_anchor_outside_stiffness", "spring_estimate",
+        "YOUNGS_MODULUS_SI",
+    ),
+    "basic_geometry": ("CrossSectionSpec", "stair"),
+    "taper": ("taper_rib_to_strip",),
+    "path": ("Any", "bend_spline_asymmetric", "List"),
+    "parallel": (
+        "build_components", "build_process_count", "BUILD_PROCESSES", "build_processes", "contextlib",
+        "import_component", "os", "Path", "ProcessPoolExecutor", "repeat", "save_component", "tempfile",
+        "write_component_gds",
+    ),
+    "cell_cache": (
+        "cell_cache", "CELL_CACHE_DIR", "cell_key", "enable_cell_cache", "geometry_hash", "hashlib", "importlib",
+        "inspect", "json", "layer_map_hash", "persistent_cell", "source_hash", "stored_cell_keys", "sys",
+    ),
+    "incremental": (
+        "cell_manifest", "changed_region", "incremental_build", "printable_component", "PRINTABLE_LAYERS",
+        "PRINTABLE_OUTPUT_LAYERS", "printable_regions", "read_printable_regions", "update_printable_regions",
+        "write_printable_regions",
+    ),
+    "sweep": ("itertools", "parameter_sweep", "pd", "sweep_parameters"),
+    "floorplan": ("floorplan", "mark_keepouts", "skyline_pack"),
+    "writer": ("multiprocessing", "struct", "write_oasis", "write_sharded"),
+    "snapshots": (
+        "check_snapshots", "register_snapshot", "SNAPSHOT_BASELINE", "SNAPSHOT_CACHE", "SNAPSHOT_CASES",
+        "snapshot_hashes", "SNAPSHOT_MODULES", "update_snapshots",
+    ),
+    "profiler": ("CellProfile", "defaultdict", "profile_cells", "time"),
+    "test_blocks": (
+        "build_spirals", "cached_spiral", "circular_bend_test", "converter_test", "converter_test_array",
+        "device_with_io_array", "euler_bend_test_array", "euler_test", "grating_coupler_test_block",
+        "SPIRAL_CACHE_DIR", "spiral_test",
+    ),
+}
+_MODULES = tuple(_EXPORTS)
+# public name -> module
+_NAMES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    if name == "__all__":
+        return sorted(set(_NAMES) | set(_MODULES))
+    if name in _NAMES:
+        value = getattr(importlib.import_module(f"{__name__}.{_NAMES[name]}"), name)
+    elif name in _MODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_NAMES) | set(_MODULES))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # the import system binds every submodule it loads on the package, keep the
+        # names that shadow a submodule (e.g. the function truss) bound to the function
+        if name in _NAMES and value is sys.modules.get(f"{__name__}.{name}"):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
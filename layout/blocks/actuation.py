@@ -1,8 +1,62 @@
-from itertools import chain
 from math import ceil, floor
 import gdsfactory as gf
+import numpy as np
 from .utils import create_deep_etch_mask
 
+EPSILON_0 = 8.8541878128e-12  # F/m
+
+
+def _teeth_points(x_root, x_tip, y_tops, thickness):
+    """(4*len(y_tops), 2) outline of teeth going from x_root to x_tip, top edges at y_tops."""
+    x = np.broadcast_to(np.array([x_root, x_tip, x_tip, x_root], dtype=float), (len(y_tops), 4))
+    y = y_tops[:, None] - np.array([0, 0, thickness, thickness], dtype=float)
+    return np.stack([x, y], axis=-1).reshape(-1, 2)
+
+
+def combdrive_finger_outlines(
+    fingers: int = 4,
+    finger_length: float = 20.0,
+    finger_gap: float = 2.0,
+    thickness: float = 5.0,
+    base_thickness: float = 3.0,
+    a_c: float = 3.0,
+):
+    """Returns the outlines of the left and right comb of combdrive_fingers as (N, 2) arrays."""
+    width = 2 * base_thickness + finger_length + a_c
+    height = fingers * thickness + (fingers - 1) * finger_gap
+    pitch = thickness + finger_gap
+    y_tops_1 = height - 2 * pitch * np.arange(ceil(fingers / 2))
+    y_tops_2 = height - pitch * (1 + 2 * np.arange(floor(fingers / 2)))
+    points_1 = np.vstack([
+        [(0, 0), (0, height)],
+        _teeth_points(base_thickness, base_thickness + finger_length, y_tops_1, thickness),
+        [(base_thickness, 0)],
+    ])
+    points_2 = np.vstack([
+        [(width, 0), (width, height), (width - base_thickness, height)],
+        _teeth_points(width - base_thickness, width - base_thickness - finger_length, y_tops_2, thickness),
+        [(width - base_thickness, 0)],
+    ])
+    return points_1, points_2
+
+
+def _add_arrayed_combs(c, fingers, finger_length, finger_gap, thickness, base_thickness, a_c, layer):
+    """Adds both combs of combdrive_fingers as spines plus arrayed fingers."""
+    width = 2 * base_thickness + finger_length + a_c
+    height = fingers * thickness + (fingers - 1) * finger_gap
+    pitch = thickness + finger_gap
+    finger = gf.components.rectangle(size=(finger_length, thickness), layer=layer, port_type=None)
+    if base_thickness > 0:
+        spine = gf.components.rectangle(size=(base_thickness, height), layer=layer, port_type=None)
+        c.add_ref(spine)
+        c.add_ref(spine).movex(width - base_thickness)
+    for n, x0, y0 in (
+        (ceil(fingers / 2), base_thickness, height - thickness),
+        (floor(fingers / 2), a_c + base_thickness, height - pitch - thickness),
+    ):
+        if n:
+            c.add_ref(finger, columns=1, rows=n, row_pitch=-2 * pitch).move((x0, y0))
+
 
 @gf.cell
 def combdrive_fingers(
@@ -16,70 +70,25 @@ def combdrive_fingers(
     layer="WG",
     mask_offset=1,
     with_mask: bool = False,
+    arrayed: bool = False,
 ):
+    """Two interdigitated combs, the left one holding the even and the right one the odd fingers.
+
+    With arrayed=True each comb is a spine plus one finger placed as an array
+    reference, which keeps the cell small for actuators with thousands of fingers.
+    """
     c = gf.Component()
 
     width = 2 * base_thickness + finger_length + a_c  # total length
     height = fingers * thickness + (fingers - 1) * finger_gap 
-    points_1 = [
-        (0, 0),
-        (0, height),
-        (base_thickness + finger_length, height),
-        (base_thickness + finger_length, height - thickness),
-        (base_thickness, height - thickness),
-        *chain.from_iterable(
-            (
-                (base_thickness, height - (2 * i) * (thickness + finger_gap)),
-                (
-                    base_thickness + finger_length,
-                    height - (2 * i) * (thickness + finger_gap),
-                ),
-                (
-                    base_thickness + finger_length,
-                    height - (2 * i) * (thickness + finger_gap) - thickness,
-                ),
-                (
-                    base_thickness,
-                    height - (2 * i) * (thickness + finger_gap) - thickness,
-                ),
-            )
-            for i in range(ceil(fingers / 2))
-        ),
-        (base_thickness, 0),
-        (0, 0),
-    ]
-
-    points_2 = [
-        (width, 0),
-        (width, height),
-        (width - base_thickness, height),
-        *chain.from_iterable(
-            (
-                (
-                    width - base_thickness,
-                    height - (1 + 2 * i) * thickness - (1 + 2 * i) * finger_gap,
-                ),
-                (
-                    width - (base_thickness + finger_length),
-                    height - (1 + 2 * i) * thickness - (1 + 2 * i) * finger_gap,
-                ),
-                (
-                    width - (base_thickness + finger_length),
-                    height - (2 + 2 * i) * thickness - (1 + 2 * i) * finger_gap,
-                ),
-                (
-                    width - base_thickness,
-                    height - (2 + 2 * i) * thickness - (1 + 2 * i) * finger_gap,
-                ),
-            )
-            for i in range(floor(fingers / 2))
-        ),
-        (width - base_thickness, 0),
-        (width, 0),
-    ]
-
-    c.add_polygon(points_1, layer=layer)
-    c.add_polygon(points_2, layer=layer)
+    if arrayed:
+        _add_arrayed_combs(c, fingers, finger_length, finger_gap, thickness, base_thickness, a_c, layer)
+    else:
+        points_1, points_2 = combdrive_finger_outlines(
+            fingers, finger_length, finger_gap, thickness, base_thickness, a_c
+        )
+        c.add_polygon(points_1, layer=layer)
+        c.add_polygon(points_2, layer=layer)
     c.add_port(
         name="w1",
         center=(0, height / 2),
@@ -114,3 +123,53 @@ def combdrive_fingers(
     
     return c
 
+
+
+def combdrive_estimate(
+    finger_gap,
+    device_thickness,
+    voltage=0.0,
+    fingers=None,
+    pair_num=None,
+    overlap=None,
+    finger_length=None,
+    a_c=None,
+    eps_r: float = 1.0,
+    fringe_factor: float = 1.0,
+) -> dict:
+    """Parallel plate estimate of comb drive capacitance, dC/dx and force.
+
+    All arguments broadcast as NumPy arrays, so whole parameter sweeps are evaluated
+    at once. Lengths are in um, like the layout parameters; results are in SI units.
+    Only the sidewalls between neighbouring fingers are counted, fringe fields can be
+    accounted for with fringe_factor.
+
+    Args:
+        finger_gap: lateral gap between neighbouring fingers.
+        device_thickness: out-of-plane thickness of the device layer.
+        voltage: drive voltage.
+        fingers: total number of fingers, as in combdrive_fingers.
+        pair_num: number of finger pairs, as in combdrive_fingers_5um (2*pair_num + 1 fingers).
+        overlap: engaged finger length. Defaults to finger_length - a_c (combdrive_fingers).
+        finger_length: finger length of combdrive_fingers.
+        a_c: tip to base clearance of combdrive_fingers.
+        eps_r: relative permittivity of the gap.
+        fringe_factor: multiplier on the parallel plate result.
+
+    Returns:
+        dict with capacitance (F), dC_dx (F/m) and force (N) along the finger axis.
+    """
+    if (fingers is None) == (pair_num is None):
+        raise ValueError("Give exactly one of fingers or pair_num")
+    if fingers is None:
+        fingers = 2 * np.asarray(pair_num) + 1
+    if overlap is None:
+        if finger_length is None or a_c is None:
+            raise ValueError("Give overlap, or finger_length and a_c")
+        overlap = np.asarray(finger_length) - np.asarray(a_c)
+    n_gaps = np.asarray(fingers) - 1
+    finger_gap = np.asarray(finger_gap, dtype=float)
+    dC_dx = fringe_factor * eps_r * EPSILON_0 * n_gaps * np.asarray(device_thickness) / finger_gap
+    capacitance = dC_dx * np.asarray(overlap) * 1e-6
+    force = 0.5 * dC_dx * np.asarray(voltage) ** 2
+    return dict(capacitance=capacitance, dC_dx=dC_dx, force=force)
@@ -0,0 +1,289 @@
+import contextlib
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import sys
+from pathlib import Path
+
+import gdsfactory as gf
+import numpy as np
+
+from . import _MODULES
+from .parallel import import_component, save_component
+from .pdk import NOEMS_LayerMap
+
+CELL_CACHE_DIR = gf.config.PATH.gdslib / "noems_cache" / "cells"
+_LAYOUT_DIR = Path(__file__).resolve().parent.parent
+# cell name -> cell_key of the cells returned by persistent_cell in this session
+stored_cell_keys: dict[str, str] = {}
+
+
+class _Uncacheable(Exception):
+    """A parameter has no stable representation, the call bypasses the cache."""
+
+
+def _is_local(obj) -> bool:
+    """True for functions defined in the blocks package or next to it (comb_drive_tuning.py)."""
+    obj = inspect.unwrap(obj)
+    if not inspect.isfunction(obj):
+        return False
+    return Path(obj.__code__.co_filename).resolve().is_relative_to(_LAYOUT_DIR)
+
+
+def _local_modules():
+    # the package loads its modules lazily, make sure all of them are there
+    for name in _MODULES:
+        importlib.import_module(f"{__package__}.{name}")
+    return [
+        module
+        for name, module in list(sys.modules.items())
+        if (name == "blocks" or name.startswith("blocks.") or name == "comb_drive_tuning")
+        and getattr(module, "__file__", None)
+    ]
+
+
+def _referenced_names(code) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _referenced_names(const)
+    return names
+
+
+def _dependencies(func) -> dict:
+    """func and every local function it references, transitively, by qualified name.
+
+    Names are resolved in the function's module, then (for imports inside the
+    function body) in the other local modules.
+    """
+    found = {}
+    stack = [inspect.unwrap(func)]
+    while stack:
+        f = stack.pop()
+        key = f"{f.__module__}.{f.__qualname__}"
+        if key in found:
+            continue
+        found[key] = f
+        for name in _referenced_names(f.__code__):
+            obj = f.__globals__.get(name)
+            if obj is None:
+                obj = next((vars(m)[name] for m in _local_modules() if name in vars(m)), None)
+            if obj is not None and _is_local(obj):
+                stack.append(inspect.unwrap(obj))
+    return found
+
+
+@functools.cache
+def source_hash(func) -> str:
+    """Hash of the source of func and of all local functions it depends on."""
+    h = hashlib.sha256()
+    for key, f in sorted(_dependencies(func).items()):
+        h.update(key.encode())
+        h.update(inspect.getsource(f).encode())
+    return h.hexdigest()[:16]
+
+
+def geometry_hash(c) -> dict[str, str]:
+    """Per-layer hash of the flattened, merged geometry of c.
+
+    The hash covers the sorted polygons of the merged region of every layer, so
+    it does not change with the hierarchy (arrays, references) or the way the
+    shapes are cut into polygons. Texts, ports and info are not included.
+    """
+    layout = c.kcl.layout
+    hashes = {}
+    for layer_index in layout.layer_indexes():
+        if c.kdb_cell.bbox(layer_index).empty():
+            continue
+        region = gf.kdb.Region(c.kdb_cell.begin_shapes_rec(layer_index)).merged()
+        polygons = sorted(polygon.to_s() for polygon in region.each())
+        info = layout.get_info(layer_index)
+        hashes[f"{info.layer}/{info.datatype}"] = hashlib.sha256("\n".join(polygons).encode()).hexdigest()[:16]
+    return dict(sorted(hashes.items()))
+
+
+def _component_payload(c) -> dict:
+    """geometry_hash, ports and info of c, not its name: anonymous components are numbered per session."""
+    ports = [
+        [port.name, port.dcplx_trans.to_s(), port.width, port.layer_info.layer, port.layer_info.datatype, port.port_type]
+        for port in c.ports
+    ]
+    return {"geometry": geometry_hash(c), "ports": ports, "info": _canonical(c.info.model_dump())}
+
+
+def _canonical(value):
+    """JSON representation of a parameter value that is stable across sessions."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, gf.Component):
+        return {"component": _component_payload(value)}
+    if isinstance(value, gf.CrossSection):
+        return {"cross_section": value.name}
+    if isinstance(value, functools.partial):
+        return {
+            "partial": _canonical(value.func),
+            "args": _canonical(value.args),
+            "keywords": _canonical(value.keywords),
+        }
+    if callable(value):
+        f = inspect.unwrap(value)
+        qualname = getattr(f, "__qualname__", "<unknown>")
+        if "<" in qualname:  # lambdas and closures have no stable identity
+            raise _Uncacheable(qualname)
+        return {
+            "function": f"{f.__module__}.{qualname}",
+            "source": source_hash(f) if _is_local(f) else None,
+        }
+    raise _Uncacheable(type(value).__name__)
+
+
+@functools.cache
+def _layer_map_hash(layers) -> str:
+    """Hash of the name -> (layer, datatype) table of a PDK layer map."""
+    table = sorted((layer.name, layer.layer, layer.datatype) for layer in layers)
+    return hashlib.sha256(json.dumps(table).encode()).hexdigest()[:16]
+
+
+def layer_map_hash() -> str:
+    """_layer_map_hash of the active PDK, of NOEMS_LayerMap if no PDK is active."""
+    try:
+        layers = gf.get_active_pdk().layers
+    except ValueError:  # no PDK active yet
+        layers = NOEMS_LayerMap
+    return _layer_map_hash(layers)
+
+
+def cell_key(func, args=(), kwargs=None) -> str:
+    """Cache key of func(*args, **kwargs).
+
+    Combines the qualified name, source_hash and the canonical bound parameters
+    (defaults included), plus the layer map and the gdsfactory version. Stored
+    cells hold resolved layer numbers, so a changed layer map must miss.
+    Component parameters are represented by their geometry, ports and info.
+    """
+    f = inspect.unwrap(func)
+    bound = inspect.signature(f).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    payload = {
+        "function": f"{f.__module__}.{f.__qualname__}",
+        "source": source_hash(f),
+        "params": _canonical(dict(bound.arguments)),
+        "layers": layer_map_hash(),
+        "gdsfactory": gf.__version__,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def persistent_cell(func=None, *, cache_dir=None, suffix=".gds"):
+    """Backs a gf.cell function with a cell store on disk.
+
+    Every call is looked up by cell_key in cache_dir/<qualname>/; on a miss the
+    cell is built and written with ports and info, on a hit it is imported with
+    import_component. Editing a function only invalidates the cells of the
+    functions that (transitively) call it. Calls with parameters that can't be
+    represented stably (lambdas, arbitrary objects) are passed straight to func.
+
+    Args:
+        func: gf.cell function.
+        cache_dir: Store directory. Defaults to CELL_CACHE_DIR.
+        suffix: ".gds" or ".oas".
+    """
+    if func is None:
+        return functools.partial(persistent_cell, cache_dir=cache_dir, suffix=suffix)
+    loaded = {}
+    f = inspect.unwrap(func)
+    directory = Path(cache_dir or CELL_CACHE_DIR) / f"{f.__module__}.{f.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = cell_key(func, args, kwargs)
+        except _Uncacheable:
+            return func(*args, **kwargs)
+        if key not in loaded:
+            path = directory / f"{key}{suffix}"
+            if path.exists():
+                loaded[key] = import_component(path)
+            else:
+                loaded[key] = func(*args, **kwargs)
+                save_component(loaded[key], path)
+            stored_cell_keys[loaded[key].name] = key
+        return loaded[key]
+
+    wrapper.is_persistent_cell = True
+    return wrapper
+
+
+def _install_cell_cache(cache_dir, suffix, include_private, namespaces):
+    """Puts persistent_cell wrappers into the namespaces.
+
+    Functions already backed by a store are re-wrapped from the plain function,
+    so the new cache_dir replaces the old one. Returns the cached functions and
+    (namespace, name, previous value) for every replaced entry.
+    """
+    wrappers = {}
+    patched = []
+    for namespace in [vars(module) for module in _local_modules()] + list(namespaces):
+        for name, obj in list(namespace.items()):
+            if not getattr(obj, "is_gf_cell", False):
+                continue
+            func = obj.__wrapped__ if getattr(obj, "is_persistent_cell", False) else obj
+            if not _is_local(func) or (name.startswith("_") and not include_private):
+                continue
+            if func not in wrappers:
+                wrappers[func] = persistent_cell(func, cache_dir=cache_dir, suffix=suffix)
+            patched.append((namespace, name, obj))
+            namespace[name] = wrappers[func]
+    names = sorted({f"{inspect.unwrap(f).__module__}.{inspect.unwrap(f).__qualname__}" for f in wrappers})
+    return names, patched
+
+
+def enable_cell_cache(cache_dir=None, suffix=".gds", include_private=False, namespaces=()) -> list[str]:
+    """Puts persistent_cell in front of the gf.cell functions of blocks and comb_drive_tuning.
+
+    The functions are replaced in every local module namespace (and in namespaces),
+    so calls between blocks go through the store as well. References taken before
+    (e.g. partials created at import time) keep calling the plain function.
+    Calling it again with another cache_dir switches the store. See cell_cache for
+    a store that is only used within a block.
+
+    Args:
+        cache_dir: Store directory. Defaults to CELL_CACHE_DIR.
+        suffix: ".gds" or ".oas".
+        include_private: Also cache functions starting with an underscore. These
+            are mostly small helper cells that are faster to build than to read.
+        namespaces: More namespace dicts to patch, e.g. globals() of a notebook
+            that did `from comb_drive_tuning import *`.
+
+    Returns:
+        The qualified names of the cached functions.
+    """
+    names, _ = _install_cell_cache(cache_dir, suffix, include_private, namespaces)
+    return names
+
+
+@contextlib.contextmanager
+def cell_cache(cache_dir=None, suffix=".gds", include_private=False, namespaces=()):
+    """enable_cell_cache while active, the namespaces are put back as they were on exit.
+
+        with cell_cache(build_dir / "cells"):
+            chip = build_chip()
+
+    Yields the qualified names of the cached functions.
+    """
+    names, patched = _install_cell_cache(cache_dir, suffix, include_private, namespaces)
+    try:
+        yield names
+    finally:
+        for namespace, name, obj in reversed(patched):
+            namespace[name] = obj
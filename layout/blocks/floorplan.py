@@ -0,0 +1,146 @@
+import gdsfactory as gf
+import numpy as np
+
+
+def _boxes_overlap(box, keepouts):
+    """Indices of the keepouts (k, 4) overlapping box (xmin, ymin, xmax, ymax)."""
+    if len(keepouts) == 0:
+        return np.zeros(0, dtype=int)
+    return np.flatnonzero(
+        (keepouts[:, 0] < box[2]) & (keepouts[:, 2] > box[0]) & (keepouts[:, 1] < box[3]) & (keepouts[:, 3] > box[1])
+    )
+
+
+def skyline_pack(sizes, width, height, keepouts=(), spacing=0) -> np.ndarray:
+    """Packs rectangles into a width x height bin with a bottom-left skyline packer.
+
+    The rectangles are placed tallest first, each at the lowest (then leftmost)
+    position on the skyline, and lifted over any keep-out they would overlap.
+
+    Args:
+        sizes: (n, 2) rectangle sizes.
+        width: Bin width, the bin spans (0, 0) to (width, height).
+        height: Bin height.
+        keepouts: (k, 4) boxes (xmin, ymin, xmax, ymax) in bin coordinates to stay out of.
+        spacing: Minimum space between rectangles and between rectangles and keep-outs.
+
+    Returns:
+        (n, 2) lower left corners in input order, NaN for rectangles that don't fit.
+    """
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    keepouts = np.asarray(keepouts, dtype=float).reshape(-1, 4)
+    # grow everything by spacing to the top right, the bin included
+    padded = sizes + spacing
+    keepouts = keepouts + [0, 0, spacing, spacing]
+    width, height = width + spacing, height + spacing
+    # skyline segments [x, y, width], left to right, covering the bin width
+    skyline = [[0.0, 0.0, width]]
+    positions = np.full_like(sizes, np.nan)
+
+    for i in np.lexsort((-padded[:, 0], -padded[:, 1])):
+        w, h = padded[i]
+        starts = np.array([segment[0] for segment in skyline])
+        tops = np.array([segment[1] for segment in skyline])
+        ends = starts + [segment[2] for segment in skyline]
+        xs = np.union1d(starts, keepouts[:, 2][(keepouts[:, 2] >= 0) & (keepouts[:, 2] < width)])
+        xs = xs[xs + w <= width]
+        # skyline height under each candidate
+        under = (starts < xs[:, None] + w) & (ends > xs[:, None])
+        ys = np.where(under, tops, -np.inf).max(axis=1)
+        best = None
+        # lowest first, keep-outs can only lift a candidate
+        for x, y in sorted(zip(xs, ys), key=lambda xy: (xy[1], xy[0])):
+            if best is not None and y > best[1]:
+                break
+            # lift over keep-outs until free
+            overlap = _boxes_overlap((x, y, x + w, y + h), keepouts)
+            while len(overlap):
+                y = keepouts[overlap, 3].max()
+                overlap = _boxes_overlap((x, y, x + w, y + h), keepouts)
+            if y + h <= height and (best is None or (y, x) < (best[1], best[0])):
+                best = (x, y)
+        if best is None:
+            continue
+        x, y = best
+        positions[i] = best
+        # raise the skyline under the rectangle to its top
+        new = []
+        for sx, sy, sw in skyline:
+            if sx < x:
+                new.append([sx, sy, min(sw, x - sx)])
+            if sx + sw > x + w:
+                start = max(sx, x + w)
+                new.append([start, sy, sx + sw - start])
+        new.append([x, y + h, w])
+        new.sort()
+        skyline = []
+        for segment in new:
+            if skyline and skyline[-1][1] == segment[1]:
+                skyline[-1][2] += segment[2]
+            else:
+                skyline.append(segment)
+    return positions
+
+
+def mark_keepouts(die: gf.Component, margin=100) -> np.ndarray:
+    """(k, 4) boxes around the alignment marks of die_with_alignment_marks, grown by margin.
+
+    Every instance of a cell whose name contains "mark_set" counts, array
+    instances contribute one box per element.
+    """
+    layout = die.kcl.layout
+    boxes = []
+    for inst in die.kdb_cell.each_inst():
+        cell = layout.cell(inst.cell_index)
+        if "mark_set" not in cell.name:
+            continue
+        for trans in inst.cell_inst.each_cplx_trans():
+            boxes.append((trans * cell.bbox()).to_dtype(layout.dbu).enlarged(margin))
+    return np.array([[b.left, b.bottom, b.right, b.top] for b in boxes]).reshape(-1, 4)
+
+
+def floorplan(
+    components,
+    die_size,
+    *,
+    c: gf.Component | None = None,
+    keepouts=(),
+    spacing=50,
+    die_margin=100,
+):
+    """Places components on a die centered at the origin, like gf.components.die.
+
+    Args:
+        components: Components (or specs) to place, packed by bbox with skyline_pack.
+        die_size: Die edge length, or (width, height).
+        c: Component to place them in. Defaults to a new component.
+        keepouts: (k, 4) boxes in die coordinates to stay out of, e.g. mark_keepouts(die).
+        spacing: Minimum space between components and keep-outs.
+        die_margin: Space kept free along the die edge.
+
+    Returns:
+        The component and the references in the order of components, None for the
+        components that didn't fit.
+    """
+    components = [gf.get_component(comp) for comp in components]
+    die_width, die_height = np.broadcast_to(np.asarray(die_size, dtype=float), 2)
+    origin = np.array([-die_width / 2 + die_margin, -die_height / 2 + die_margin])
+    boxes = np.array([(comp.xmin, comp.ymin, comp.xmax, comp.ymax) for comp in components]).reshape(-1, 4)
+    positions = skyline_pack(
+        boxes[:, 2:] - boxes[:, :2],
+        die_width - 2 * die_margin,
+        die_height - 2 * die_margin,
+        keepouts=np.asarray(keepouts, dtype=float).reshape(-1, 4) - np.tile(origin, 2),
+        spacing=spacing,
+    )
+    if c is None:
+        c = gf.Component()
+    refs = []
+    for comp, box, position in zip(components, boxes, positions):
+        if np.isnan(position[0]):
+            refs.append(None)
+            continue
+        ref = c.add_ref(comp)
+        ref.move(tuple(origin + position - box[:2]))
+        refs.append(ref)
+    return c, refs
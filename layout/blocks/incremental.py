@@ -0,0 +1,268 @@
+import hashlib
+import json
+from pathlib import Path
+
+import gdsfactory as gf
+
+from .cell_cache import cell_cache, stored_cell_keys
+from .pdk import noems_layer
+
+PRINTABLE_LAYERS = ("DEEP_ETCH", "PADDING", "WG", "SHALLOW_ETCH", "PROTECTION_PL", "DEEP_ETCH_PL")
+# output layers of printable_regions
+PRINTABLE_OUTPUT_LAYERS = ("DEEP_ETCH", "WG", (7, 0), "DEEP_ETCH_PL", (10, 0))
+
+
+def printable_regions(c, window: gf.kdb.Region | None = None) -> dict:
+    """The flat layers of convert_to_printable as regions, output layer -> Region.
+
+    WG is the union of PRINTABLE_LAYERS with holes under 1 um^2 filled, DEEP_ETCH
+    its hull shrunk by 3 um, (7, 0) the bbox of the printable layers grown by
+    100 um, DEEP_ETCH_PL the bbox minus the hull plus the original DEEP_ETCH_PL
+    and (10, 0) the original DEEP_ETCH.
+
+    Args:
+        c: Component to convert.
+        window: Only use the shapes touching this region (dbu). The result is
+            correct inside the window shrunk by a few um, (7, 0) is always complete.
+    """
+    layout = c.kcl.layout
+
+    def layer_region(layer):
+        layer_index = noems_layer(layer)
+        if window is None:
+            return gf.kdb.Region(c.begin_shapes_rec(layer_index))
+        return gf.kdb.Region(gf.kdb.RecursiveShapeIterator(layout, c.kdb_cell, layer_index, window, False))
+
+    reg = gf.kdb.Region()
+    bbox = gf.kdb.Box()
+    for layer in PRINTABLE_LAYERS:
+        reg.insert(layer_region(layer))
+        bbox += c.kdb_cell.bbox(noems_layer(layer))
+    # fill small holes
+    min_area = 1e6
+    holes = reg.holes()
+    holes.merged_semantics = False
+    reg.insert(holes.with_area(0, min_area, False))
+    hulls = reg.sized(-3e3, 1)
+    bbox_region = gf.kdb.Region(bbox.enlarged(round(100 / c.kcl.dbu)))
+    return {
+        "DEEP_ETCH": hulls,
+        "WG": reg,
+        (7, 0): bbox_region,
+        "DEEP_ETCH_PL": (bbox_region - hulls) | layer_region("DEEP_ETCH_PL"),
+        (10, 0): layer_region("DEEP_ETCH"),
+    }
+
+
+def printable_component(regions: dict, c, post_collection_layers=("MTOP", "SHALLOW_ETCH")) -> gf.Component:
+    """Component with the printable regions and the post_collection_layers of c."""
+    c_output = gf.Component()
+    for layer, region in regions.items():
+        if not region.is_empty():
+            c_output.add_polygon(region, layer=layer)
+    c_output << c.extract(list(post_collection_layers))
+    return c_output
+
+
+def update_printable_regions(regions: dict, c, changed: gf.kdb.Region, halo=100) -> dict:
+    """printable_regions(c), recomputed only inside changed.
+
+    Args:
+        regions: printable_regions of a previous build of c.
+        c: The new build.
+        changed: Region (dbu) where c differs from the previous build, see changed_region.
+        halo: Extra um around changed whose shapes are taken into account.
+    """
+    if changed.is_empty():
+        return regions
+    fresh = printable_regions(c, window=changed.sized(round(halo / c.kcl.dbu)))
+    if fresh[(7, 0)] != regions[(7, 0)]:
+        # the chip outline moved, DEEP_ETCH_PL changes everywhere
+        return printable_regions(c)
+    return {layer: (regions[layer] - changed) | (fresh[layer] & changed) for layer in fresh}
+
+
+def write_printable_regions(regions: dict, gdspath) -> None:
+    layout = gf.kdb.Layout()
+    layout.dbu = gf.kcl.dbu
+    top = layout.create_cell("printable_regions")
+    for layer, region in regions.items():
+        layer_info = gf.kcl.layout.get_info(noems_layer(layer))
+        top.shapes(layout.layer(layer_info)).insert(region)
+    layout.write(str(gdspath))
+
+
+def read_printable_regions(gdspath) -> dict:
+    layout = gf.kdb.Layout()
+    layout.read(str(gdspath))
+    top = layout.top_cell()
+    regions = {}
+    for layer in PRINTABLE_OUTPUT_LAYERS:
+        layer_index = layout.find_layer(gf.kcl.layout.get_info(noems_layer(layer)))
+        regions[layer] = gf.kdb.Region() if layer_index is None else gf.kdb.Region(top.shapes(layer_index))
+    return regions
+
+
+def _box_list(box) -> list[float]:
+    return [box.left, box.bottom, box.right, box.top]
+
+
+def cell_manifest(c) -> dict:
+    """Dependency graph of c with content hashes, for changed_region.
+
+    Every cell of the hierarchy is stored under a hash of its shapes and of its
+    instances (child hash, transformation, array), or under its cell_key if it
+    came from the cell store, so equal hashes mean equal geometry. For each cell
+    the own shapes are hashed per layer, and the child instances are listed with
+    their bboxes.
+    """
+    layout = c.kcl.layout
+    called = set(c.kdb_cell.called_cells()) | {c.cell_index()}
+    fingerprints = {}
+    cells = {}
+    for cell_index in layout.each_cell_bottom_up():
+        if cell_index not in called:
+            continue
+        cell = layout.cell(cell_index)
+        shapes = {}
+        for layer_index in layout.layer_indexes():
+            layer_shapes = cell.shapes(layer_index)
+            if layer_shapes.is_empty():
+                continue
+            # compare merged geometry: GDS files store rectangles as boxes and
+            # polygons with holes as cut polygons
+            region = gf.kdb.Region(layer_shapes).merged()
+            lines = sorted(str(polygon) for polygon in region.each())
+            lines += sorted(str(shape.text) for shape in layer_shapes.each(gf.kdb.Shapes.STexts))
+            shapes[layout.get_info(layer_index).to_s()] = [
+                hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16],
+                _box_list(region.bbox().to_dtype(layout.dbu)),
+            ]
+        children = []
+        for inst in cell.each_inst():
+            array = ""
+            if inst.is_regular_array():
+                array = " ".join(sorted(f"{n} {d}" for n, d in [(inst.na, inst.da), (inst.nb, inst.db)]))
+            children.append([fingerprints[inst.cell_index], inst.dcplx_trans.to_s(), array, _box_list(inst.dbbox())])
+        children.sort()
+        # cells from the store are identified by their key, the geometry read
+        # back from a file can differ from the built one by zero-area vertices
+        fingerprint = stored_cell_keys.get(cell.name) or (
+            hashlib.sha256(json.dumps([shapes, [child[:3] for child in children]]).encode()).hexdigest()[:16]
+        )
+        fingerprints[cell_index] = fingerprint
+        cells[fingerprint] = {
+            "name": cell.name,
+            "bbox": _box_list(cell.dbbox()),
+            "shapes": shapes,
+            "children": children,
+        }
+    return {"top": fingerprints[c.cell_index()], "dbu": layout.dbu, "cells": cells}
+
+
+def changed_region(old: dict, new: dict) -> gf.kdb.Region:
+    """Region (dbu) where the geometry of two cell_manifests differs.
+
+    Walks both hierarchies from the top: unchanged subtrees are skipped, a changed
+    single instance at the same place is compared recursively, everything else
+    (changed own shapes, added, removed or moved instances) adds its bbox.
+    """
+    dbu = new["dbu"]
+    boxes = []
+
+    def add_box(trans, box):
+        boxes.append((trans * gf.kdb.DBox(*box)).to_itype(dbu))
+
+    def diff(old_fingerprint, new_fingerprint, trans):
+        if old_fingerprint == new_fingerprint:
+            return
+        old_cell, new_cell = old["cells"][old_fingerprint], new["cells"][new_fingerprint]
+        for layer in set(old_cell["shapes"]) | set(new_cell["shapes"]):
+            old_shapes = old_cell["shapes"].get(layer)
+            new_shapes = new_cell["shapes"].get(layer)
+            if old_shapes != new_shapes:
+                for shapes in (old_shapes, new_shapes):
+                    if shapes is not None:
+                        add_box(trans, shapes[1])
+        old_children = list(old_cell["children"])
+        unmatched = []
+        for child in new_cell["children"]:
+            if child in old_children:
+                old_children.remove(child)
+            else:
+                unmatched.append(child)
+        for child in unmatched:
+            fingerprint, child_trans, array, box = child
+            same_place = next(
+                (old_child for old_child in old_children if old_child[1:3] == [child_trans, ""] and not array),
+                None,
+            )
+            if same_place is None:
+                add_box(trans, box)
+            else:
+                old_children.remove(same_place)
+                diff(same_place[0], fingerprint, trans * gf.kdb.DCplxTrans.from_s(child_trans))
+        for child in old_children:
+            add_box(trans, child[3])
+
+    diff(old["top"], new["top"], gf.kdb.DCplxTrans())
+    region = gf.kdb.Region()
+    for box in boxes:
+        region.insert(box)
+    return region.merged()
+
+
+def incremental_build(
+    build_chip,
+    build_dir,
+    printable=True,
+    post_collection_layers=("MTOP", "SHALLOW_ETCH"),
+    halo=100,
+    suffix=".gds",
+):
+    """Builds build_chip() reusing the previous build in build_dir.
+
+    During the build, the gf.cell functions of blocks, comb_drive_tuning and the
+    namespace of build_chip go through the cell store in build_dir/cells (see
+    cell_cache), so only the cells whose source or parameters changed and their
+    parents are rebuilt. The cell manifest of the chip is compared with the previous
+    one and the printable layers (see convert_to_printable) are only recomputed in
+    the changed region.
+
+    Args:
+        build_chip: Function without arguments returning the chip component.
+        build_dir: Directory for the cell store, the manifest and the printable layers.
+        printable: Also return the printable component.
+        post_collection_layers: See convert_to_printable.
+        halo: See update_printable_regions.
+        suffix: Cell store format, ".gds" or ".oas".
+
+    Returns:
+        The chip, the printable component (None if printable is False) and the
+        changed region (dbu, None for a first build).
+    """
+    build_dir = Path(build_dir)
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = build_dir / "manifest.json"
+    regions_path = build_dir / "printable_regions.gds"
+
+    with cell_cache(cache_dir=build_dir / "cells", suffix=suffix, namespaces=[build_chip.__globals__]):
+        chip = build_chip()
+    manifest = cell_manifest(chip)
+    changed = None
+    if manifest_path.exists():
+        changed = changed_region(json.loads(manifest_path.read_text()), manifest)
+
+    c_printable = None
+    if printable:
+        if changed is None or not regions_path.exists():
+            regions = printable_regions(chip)
+        else:
+            regions = update_printable_regions(read_printable_regions(regions_path), chip, changed, halo)
+        write_printable_regions(regions, regions_path)
+        c_printable = printable_component(regions, chip, post_collection_layers)
+    else:
+        # the stored regions would not match the new manifest
+        regions_path.unlink(missing_ok=True)
+    manifest_path.write_text(json.dumps(manifest))
+    return chip, c_printable, changed
@@ -0,0 +1,72 @@
+import gdsfactory as gf
+import numpy as np
+
+# single crystal silicon, E along <110>
+YOUNGS_MODULUS_SI = 169e9  # Pa
+DENSITY_SI = 2329  # kg/m^3
+
+
+def guided_beam_stiffness(spring_width, spring_length, device_thickness, youngs_modulus=YOUNGS_MODULUS_SI):
+    """(k_bending, k_axial) in N/m of a fixed-guided beam, lengths in um.
+
+    k_bending is across the beam in the layout plane, k_axial along it.
+    """
+    w = np.asarray(spring_width, dtype=float) * 1e-6
+    L = np.asarray(spring_length, dtype=float) * 1e-6
+    t = np.asarray(device_thickness, dtype=float) * 1e-6
+    return youngs_modulus * t * w**3 / L**3, youngs_modulus * t * w / L
+
+
+def spring_anchor_outside_stiffness(spring_width, spring_length, device_thickness, youngs_modulus=YOUNGS_MODULUS_SI) -> dict:
+    """k_x, k_y of spring_anchor_outside: four parallel beams along y.
+
+    Double it for spring_pair_anchor_outside (up and down spring).
+    """
+    k_bending, k_axial = guided_beam_stiffness(spring_width, spring_length, device_thickness, youngs_modulus)
+    return dict(k_x=4 * k_bending, k_y=4 * k_axial)
+
+
+def spring_5um_stiffness(spring_width, spring_length, num_loops, device_thickness, youngs_modulus=YOUNGS_MODULUS_SI) -> dict:
+    """k_x, k_y of spring_5um: 2*num_loops + 1 beams along y in series, between ports p1 and p2.
+
+    The perforated flying bars between the beams are taken as rigid.
+    """
+    k_bending, k_axial = guided_beam_stiffness(spring_width, spring_length, device_thickness, youngs_modulus)
+    n_beams = 2 * np.asarray(num_loops) + 1
+    return dict(k_x=k_bending / n_beams, k_y=k_axial / n_beams)
+
+
+def folded_spring_5um_stiffness(width, length, device_thickness, youngs_modulus=YOUNGS_MODULUS_SI) -> dict:
+    """k_x, k_y of folded_spring_5um: two pairs of parallel beams along y in series."""
+    k_bending, k_axial = guided_beam_stiffness(width, length, device_thickness, youngs_modulus)
+    return dict(k_x=k_bending, k_y=k_axial)
+
+
+def component_mass(component, device_thickness, layer="WG", density=DENSITY_SI) -> float:
+    """Mass in kg of the merged area of layer in component, e.g. a truss or perforated_shaft shuttle."""
+    layer_index = gf.get_layer(layer)
+    region = gf.kdb.Region(component.begin_shapes_rec(layer_index)).merged()
+    area = region.area() * component.kcl.dbu**2 * 1e-12  # m^2
+    return area * device_thickness * 1e-6 * density
+
+
+def resonance_frequency(k, mass):
+    """First resonance in Hz of a spring-mass system, k in N/m, mass in kg."""
+    return np.sqrt(np.asarray(k) / np.asarray(mass)) / (2 * np.pi)
+
+
+def spring_estimate(stiffness: dict, mass=None) -> dict:
+    """Adds the resonances f_x, f_y for mass to a stiffness dict from the functions above."""
+    estimate = dict(stiffness)
+    if mass is not None:
+        estimate["mass"] = mass
+        estimate["f_x"] = resonance_frequency(stiffness["k_x"], mass)
+        estimate["f_y"] = resonance_frequency(stiffness["k_y"], mass)
+    return estimate
+
+
+def add_spring_info(c: gf.Component, estimate: dict) -> gf.Component:
+    """Stores a scalar spring_estimate in c.info (k_x, k_y in N/m, f_x, f_y in Hz)."""
+    for key, value in estimate.items():
+        c.info[key] = float(value)
+    return c
@@ -2,6 +2,8 @@ import gdsfactory as gf
 import math
 import numpy as np
 import functools
+import pathlib
+from typing import Literal
 from gdsfactory.generic_tech import LAYER
 
 
@@ -257,6 +259,150 @@ def my_coupler(
     return c2
 
 
+@functools.lru_cache(maxsize=None)
+def _freetype_glyph(letter, font, size):
+    """Polygons at the text origin and horizontal advance of letter in text_freetype(size=size, font=font).
+
+    The only place that relies on gdsfactory internals: the font lookup and glyph
+    metrics of gdsfactory.font and gdsfactory.constants, and the undecorated
+    text_freetype, whose cell cache mixes up letters with the same sanitized cell
+    name, e.g. '.' and 'p'. tests/test_text.py compares text_outline against
+    text_freetype, so a gdsfactory release that changes them fails there.
+    """
+    if font == "DEPLOF":
+        from gdsfactory.constants import _indent, _width
+
+        if letter == " ":
+            advance = 500 * size / 1000
+        elif ord(letter) not in _width:
+            advance = 0
+        else:
+            advance = (_width[ord(letter)] + _indent[ord(letter)]) * size / 1000
+    else:
+        from gdsfactory.font import _get_font_by_file, _get_font_by_name, _get_glyph
+
+        font_path = pathlib.Path(font)
+        if font_path.is_file() and font_path.suffix in {".otf", ".ttf"}:
+            face = _get_font_by_file(str(font))
+        else:
+            face = _get_font_by_name(str(font))
+        _, advance_x, ascender = _get_glyph(face, letter)
+        advance = size / ascender * advance_x
+    layer = (1, 0)
+    glyph = gf.components.text_freetype.__wrapped__(text=letter, size=size, layer=layer, font=font)
+    polygons = tuple(glyph.get_polygons().get(gf.get_layer(layer), []))
+    glyph.delete()
+    return polygons, advance
+
+
+def _merged_region(polygons):
+    """Merged region of polygons, read back from a cell like gf.boolean does.
+
+    Sized polygons with holes can self-overlap, so this is not the same as
+    merging them directly.
+    """
+    layout = gf.kdb.Layout()
+    layout.dbu = gf.kcl.dbu
+    cell = layout.create_cell("glyph")
+    layer_index = layout.layer()
+    for p in polygons:
+        cell.shapes(layer_index).insert(p)
+    return gf.kdb.Region(cell.begin_shapes_rec(layer_index)).merged()
+
+
+@functools.lru_cache(maxsize=None)
+def _glyph_region(letter, font, size, layer):
+    """Merged region of a single glyph."""
+    return _merged_region(_freetype_glyph(letter, font, size)[0])
+
+
+@functools.lru_cache(maxsize=None)
+def _glyph_sized_region(letter, font, size, layer, outline_width):
+    """Merged region of a single glyph with every polygon sized by outline_width on its own."""
+    return _merged_region(p.sized(outline_width * 1000) for p in _freetype_glyph(letter, font, size)[0])
+
+
+def _gds_polygons(region):
+    """Polygons of region with their holes cut into the hull, the way GDS stores them.
+
+    The cut lines are snapped to the grid where they meet a slanted edge, so an
+    outline with holes would change when written. Cutting them in memory keeps the
+    layout, the written file and a component read back from it identical.
+    """
+    return [polygon.resolved_holes() for polygon in region.each()]
+
+
+@gf.cell
+def _outlined_glyph(char_code, font, size, layer, outline_width):
+    """Outline of a single glyph, the building block of text_outline.
+
+    Keyed by the character code, since cell names drop characters like '(' and ')'.
+    """
+    c = gf.Component()
+    letter = chr(char_code)
+    region = _glyph_region(letter, font, size, layer)
+    for polygon in _gds_polygons(_glyph_sized_region(letter, font, size, layer, outline_width) - region):
+        c.add_polygon(polygon, layer=layer)
+    return c
+
+
+def _glyph_placements(text, font, size):
+    """[(letter, x, y)] of the visible letters of text, laid out like text_freetype."""
+    line_pitch = 1.5 * size if font == "DEPLOF" else size
+    placements = []
+    for i, line in enumerate(text.split("\n")):
+        x = 0
+        for letter in line:
+            if letter != " ":
+                placements.append((letter, x, -i * line_pitch))
+            x += _freetype_glyph(letter, font, size)[1]
+    return placements
+
+
+def _outlines_interact(boxes, outline_width):
+    """True if the outline of any glyph reaches into another glyph, boxes is (n, 4) of left, bottom, right, top."""
+    outer = boxes + np.array([-1, -1, 1, 1]) * outline_width
+    overlap = (
+        (outer[:, None, 0] < boxes[None, :, 2])
+        & (boxes[None, :, 0] < outer[:, None, 2])
+        & (outer[:, None, 1] < boxes[None, :, 3])
+        & (boxes[None, :, 1] < outer[:, None, 3])
+    )
+    np.fill_diagonal(overlap, False)
+    return overlap.any()
+
+
+@gf.cell
+def text_glyph(char_code, font, size, layer):
+    """Single glyph of text_freetype at its text origin, keyed by character code."""
+    c = gf.Component()
+    c.add_polygon(_glyph_region(chr(char_code), font, size, layer), layer=layer)
+    return c
+
+
+def text_glyph_placements(text, size=10, font=gf.config.PATH.font_ocr, layer="WG"):
+    """Lays out text like text_freetype, from cached text_glyph cells.
+
+    Returns:
+        [(glyph, x, y)] for every visible letter and the bbox of the text as
+        a (left, bottom, right, top) array.
+    """
+    placements = []
+    boxes = []
+    for letter, x, y in _glyph_placements(text, str(font), size):
+        region = _glyph_region(letter, str(font), size, layer)
+        if region.is_empty():
+            continue
+        box = region.bbox().to_dtype(gf.kcl.dbu)
+        placements.append((text_glyph(ord(letter), str(font), size, layer), x, y))
+        boxes.append((box.left + x, box.bottom + y, box.right + x, box.top + y))
+    boxes = np.array(boxes).reshape(-1, 4)
+    if len(boxes) == 0:
+        return placements, np.zeros(4)
+    bbox = np.concatenate([boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)])
+    return placements, bbox
+
+
 @gf.cell
 def text_outline(
     text,
@@ -267,12 +413,35 @@ def text_outline(
     mask_layer=(1, 0),
     with_mask=True,
 ):
+    """Outlined text, assembled from cached outlined glyphs.
+
+    Glyphs are placed as references to _outlined_glyph cells, one per
+    (letter, font, size, layer, outline_width). Only if the outline of one glyph
+    reaches into another glyph the string is merged into polygons, so that the
+    outline never cuts into a letter.
+    """
     c = gf.Component()
-    t = gf.components.text_freetype(text=text, size=size - 1, layer=layer, font=font)
-    c2 = gf.Component()
-    for p in t.get_polygons()[gf.get_layer(layer)]:
-        c2.add_polygon(p.sized(outline_width * 1000), layer=layer)
-    c << gf.boolean(c2, t, "not", layer=layer)
+    glyph_size = size - 1
+    placements = _glyph_placements(text, font, glyph_size)
+    boxes = np.array(
+        [
+            (box.left + x, box.bottom + y, box.right + x, box.top + y)
+            for letter, x, y in placements
+            for box in [_glyph_region(letter, font, glyph_size, layer).bbox().to_dtype(c.kcl.dbu)]
+        ]
+    ).reshape(-1, 4)
+    if _outlines_interact(boxes, outline_width):
+        body, sized_body = gf.kdb.Region(), gf.kdb.Region()
+        for letter, x, y in placements:
+            dx, dy = round(x * 1000), round(y * 1000)
+            body += _glyph_region(letter, font, glyph_size, layer).moved(dx, dy)
+            sized_body += _glyph_sized_region(letter, font, glyph_size, layer, outline_width).moved(dx, dy)
+        for polygon in _gds_polygons(sized_body - body):
+            c.add_polygon(polygon, layer=layer)
+    else:
+        for letter, x, y in placements:
+            glyph = _outlined_glyph(ord(letter), font, glyph_size, layer, outline_width)
+            c.add_ref(glyph).move((x, y))
     if with_mask:
         bbox = gf.kdb.DPolygon(c.bbox())
         c.add_polygon(bbox.sized(4), layer=mask_layer)
@@ -310,26 +479,49 @@ def big_mark_set(seperation=1500, layer=(7, 0)):
     return c
 
 
+@functools.lru_cache(maxsize=None)
+def _mark_set_region(kind):
+    """Flat geometry of big_mark_set or small_mark_set, built once on its default layer."""
+    mark_set = {"big": big_mark_set, "small": small_mark_set}[kind]()
+    return gf.kdb.Region(mark_set.begin_shapes_rec(gf.get_layer((7, 0)))).merged()
+
+
 @gf.cell
-def die_with_alignment_marks(die_size, layers):
+def stamped_mark_set(kind: Literal["big", "small"], layer=(7, 0)):
+    """big_mark_set or small_mark_set on layer, stamped from geometry shared by all layers."""
+    c = gf.Component()
+    c.add_polygon(_mark_set_region(kind), layer=layer)
+    return c
+
+
+@gf.cell
+def die_with_alignment_marks(die_size, layers, shared_marks: bool = False):
+    """Die outline with global marks left and right and chip marks in the corners, for every layer.
+
+    With shared_marks=True the mark geometry is built once and stamped onto every layer
+    instead of building big_mark_set and small_mark_set per layer.
+    """
     c = gf.Component()
     c << gf.components.die(size=(die_size, die_size), die_name=f"{die_size}*{die_size}")
 
     for layer in layers:
+        if shared_marks:
+            big_marks = stamped_mark_set("big", layer=layer)
+            small_marks = stamped_mark_set("small", layer=layer)
+        else:
+            big_marks = big_mark_set(layer=layer)
+            small_marks = small_mark_set(layer=layer)
     
-        global_mark_left = c << big_mark_set(layer=layer)
+        global_mark_left = c << big_marks
         global_mark_left.dmovex(die_size / 2 + 500)
-        global_mark_right = c << big_mark_set(layer=layer)
+        global_mark_right = c << big_marks
         global_mark_right.dmovex(-die_size / 2 - 500)
-        chip_mark_points = [
-            [-die_size / 2 + 1000, die_size / 2 - 1000],
-            [die_size / 2 - 1000, die_size / 2 - 1000],
-            [die_size / 2 - 1000, -die_size / 2 + 1000],
-            [-die_size / 2 + 1000, -die_size / 2 + 1000],
-        ]
-        for point in chip_mark_points:
-            chip_mark = c << small_mark_set(layer=layer)
-            chip_mark.dmove(point)
+        # chip marks in the four corners
+        chip_mark_pitch = die_size - 2000
+        chip_marks = c.add_ref(
+            small_marks, columns=2, rows=2, column_pitch=chip_mark_pitch, row_pitch=chip_mark_pitch
+        )
+        chip_marks.dmove((-die_size / 2 + 1000, -die_size / 2 + 1000))
             
     return c
 
@@ -341,14 +533,11 @@ def ruler_mark(layer1, layer2, base_pitch=2, offset=0.05):
     short_mark_layer1 = gf.components.rectangle(size=(0.3, 5), layer=layer1)
     long_mark_layer2 = gf.components.rectangle(size=(0.3, 5), layer=layer2)
     short_mark_layer2 = gf.components.rectangle(size=(0.3, 5), layer=layer2)
-    for i in range(11):
-        if i % 5 == 0:
-            (c << long_mark_layer1).dmovex(i * base_pitch)
-        (c << short_mark_layer1).dmovex(i * base_pitch)
-    for i in range(11):
-        if i % 5 == 0:
-            (c << long_mark_layer2).dmovex(i * (base_pitch + offset)).dmovey(-10)
-        (c << short_mark_layer2).dmovex(i * (base_pitch + offset)).dmovey(-5)
+    # 11 ticks per scale, with a long tick every 5th
+    c.add_ref(long_mark_layer1, columns=3, column_pitch=5 * base_pitch)
+    c.add_ref(short_mark_layer1, columns=11, column_pitch=base_pitch)
+    c.add_ref(long_mark_layer2, columns=3, column_pitch=5 * (base_pitch + offset)).dmovey(-10)
+    c.add_ref(short_mark_layer2, columns=11, column_pitch=base_pitch + offset).dmovey(-5)
     c2 = gf.Component()
     ref1 = c2 << c
     ref1.dmovex(-0.15)
@@ -378,25 +567,28 @@ def ruler_set():
     return c
 
 
+@functools.lru_cache(maxsize=None)
+def _frame_region(size):
+    """The four l_corner marks of frame, flat and merged."""
+    corner = gf.kdb.Region(l_corner((7, 0)).begin_shapes_rec(gf.get_layer((7, 0)))).merged()
+    half = int(round(size / 2 / gf.kcl.dbu))
+    region = corner.moved(-half, -half)
+    region += corner.transformed(gf.kdb.Trans(gf.kdb.Trans.M90, half, -half))
+    region += corner.transformed(gf.kdb.Trans(gf.kdb.Trans.M0, -half, half))
+    region += corner.transformed(gf.kdb.Trans(gf.kdb.Trans.R180, half, half))
+    return region
+
+
 @gf.cell
 def frame(size=10000, layers=((2, 6))):
+    """Four l_corner marks at the corners of a size x size square on every layer.
+
+    The corners are computed once per size and stamped onto each layer.
+    """
     c = gf.Component()
+    region = _frame_region(size)
     for layer in layers:
-        corner_rt = c << l_corner(layer)
-        corner_rb = c << l_corner(layer)
-        corner_lt = c << l_corner(layer)
-        corner_lb = c << l_corner(layer)
-
-        corner_lb.dmove((-size / 2, -size / 2))
-        corner_rb.dmirror_x()
-        corner_rb.dmove((size / 2, -size / 2))
-
-        corner_lt.dmirror_y()
-        corner_lt.dmove((-size / 2, size / 2))
-
-        corner_rt.dmirror_x()
-        corner_rt.dmirror_y()
-        corner_rt.dmove((size / 2, size / 2))
+        c.add_polygon(region, layer=layer)
 
     return c
 
@@ -0,0 +1,126 @@
+import contextlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import gdsfactory as gf
+
+# worker processes of the parallel builds when no count is passed, None for os.cpu_count()
+BUILD_PROCESSES: int | None = None
+
+
+@contextlib.contextmanager
+def build_processes(processes):
+    """Sets BUILD_PROCESSES while active.
+
+    The process count of cells that build their children in parallel (e.g.
+    spiral_test) is set this way rather than as a cell parameter, so it doesn't
+    end up in the cell name:
+
+        with build_processes(8):
+            c = spiral_test(gc, xs)
+    """
+    global BUILD_PROCESSES
+    previous, BUILD_PROCESSES = BUILD_PROCESSES, processes
+    try:
+        yield
+    finally:
+        BUILD_PROCESSES = previous
+
+
+def build_process_count(processes=None) -> int:
+    """processes, else BUILD_PROCESSES, else os.cpu_count()."""
+    return processes or BUILD_PROCESSES or os.cpu_count() or 1
+
+
+def save_component(c, gdspath):
+    """Writes c with ports and info to gdspath (GDS or OASIS, by suffix).
+
+    The file is written under a temporary name first, so readers never see a
+    half-written file. Anonymous cells are numbered per process, so they are
+    prefixed with the (unique) top cell name to keep them from being mistaken for
+    anonymous cells of the process that imports the file.
+    """
+    for cell_index in c.kdb_cell.called_cells():
+        cell = c.kcl.layout.cell(cell_index)
+        if cell.name.startswith("Unnamed_"):
+            cell.name = f"{c.name}_{cell.name}"
+    gdspath = Path(gdspath)
+    gdspath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = gdspath.with_name(f"{gdspath.stem}.{os.getpid()}.tmp{gdspath.suffix}")
+    c.write_gds(tmp_path, with_metadata=True)
+    os.replace(tmp_path, gdspath)
+
+
+def _top_cell_name(gdspath) -> str:
+    """Name of the top cell of gdspath, reading the cells but no shapes.
+
+    This is the name as stored: the writers replace characters like spaces and
+    newlines in cell names.
+    """
+    options = gf.kdb.LoadLayoutOptions()
+    options.create_other_layers = False
+    layout = gf.kdb.Layout()
+    layout.read(str(gdspath), options)
+    return layout.top_cell().name
+
+
+def write_component_gds(component_spec, kwargs, gdspath):
+    """Builds component_spec(**kwargs) and writes it with save_component.
+
+    Runs in worker processes. Returns the name of the written cell as stored in gdspath.
+    """
+    c = component_spec(**kwargs)
+    save_component(c, gdspath)
+    return _top_cell_name(gdspath)
+
+
+def import_component(gdspath, cellname=None) -> gf.Component:
+    """Reads a GDS/OASIS file written by write_component_gds into the active layout.
+
+    Unlike gf.import_gds, cells whose names already exist in the layout are reused
+    instead of duplicated (gf.cell names encode the parameters), so the result can be
+    mixed with cells built in this process and still be written out.
+    Ports, info and the port cross-sections are restored.
+
+    Args:
+        gdspath: File to read.
+        cellname: Name of the cell to return. Defaults to the top cell of the file.
+    """
+    if cellname is None:
+        cellname = _top_cell_name(gdspath)
+    if gf.kcl.layout.has_cell(cellname):
+        return gf.Component(base=gf.kcl[cellname].base)
+    gf.kcl.read(gdspath, register_cells=True, test_merge=False)
+    return gf.Component(base=gf.kcl[cellname].base)
+
+
+def build_components(component_spec, kwargs_list, processes=None, initializer=None, initargs=()):
+    """Returns [component_spec(**kwargs) for kwargs in kwargs_list], built in a process pool.
+
+    Every component is built in a worker, written to a temporary GDS file and imported
+    back with import_component. The geometry is the same as with a serial build as
+    long as the cells survive a GDS round trip, which polygons with holes only do if
+    their holes are already cut into the hull (see mylib._gds_polygons). Cell names
+    come back as stored, with characters like newlines replaced.
+
+    Args:
+        component_spec: Picklable component function (module level function or partial).
+        kwargs_list: Keyword arguments for each component.
+        processes: Number of worker processes, see build_process_count.
+            With one process (or one component) everything is built in this process.
+        initializer: Called in each worker on start, e.g. activate_noems_pdk when
+            workers are spawned instead of forked.
+        initargs: Arguments for initializer.
+    """
+    kwargs_list = list(kwargs_list)
+    max_workers = min(len(kwargs_list), build_process_count(processes))
+    if max_workers <= 1:
+        return [component_spec(**kwargs) for kwargs in kwargs_list]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gdspaths = [Path(tmpdir) / f"component_{i}.gds" for i in range(len(kwargs_list))]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs) as pool:
+            cellnames = list(pool.map(write_component_gds, repeat(component_spec), kwargs_list, gdspaths))
+        return [import_component(gdspath, cellname) for gdspath, cellname in zip(gdspaths, cellnames)]
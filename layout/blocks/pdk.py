@@ -0,0 +1,80 @@
+import functools
+
+import gdsfactory as gf
+from gdsfactory.generic_tech import LAYER
+from gdsfactory.technology import LayerMap
+from gdsfactory.typings import Layer
+
+
+class NOEMS_LayerMap(LayerMap):
+    WG: Layer = (1, 0)
+    DEEP_ETCH: Layer = (3, 6)
+    SHALLOW_ETCH: Layer = (2, 6)
+    ALD_CORE: Layer = (5, 0)
+    ALD_ETCH_EBL: Layer = (3, 8)
+    ALD_ETCH_PL: Layer = (3, 10)
+    DEEP_ETCH_EBL: Layer = (10, 0)
+    DEEP_ETCH_PL: Layer = (9, 0)
+    PROTECTION_PL: Layer = (11, 0)
+    MTOP: Layer = (12, 24)
+    PADDING: Layer = (67, 0)
+    SLAB150: Layer = (2, 0)
+    SLAB90: Layer = (3, 0)
+    # the generic enum member ends up as (4, 34), which is where existing dies draw their outline
+    FLOORPLAN: Layer = LAYER.FLOORPLAN
+    MARKER: Layer = (66, 0)
+
+
+# layer name -> (layer, datatype)
+NOEMS_LAYERS = {layer.name: (layer.layer, layer.datatype) for layer in NOEMS_LayerMap}
+
+
+@functools.cache
+def get_noems_pdk() -> gf.Pdk:
+    """The NOEMS PDK: NOEMS_LayerMap with the generic cross-sections, layer views and cells.
+
+    Built on first use, not on import.
+    """
+    from gdsfactory.generic_tech import get_generic_pdk
+
+    generic_pdk = get_generic_pdk()
+    return gf.Pdk(
+        name="tunable_noems_pdk",
+        layers=NOEMS_LayerMap,
+        cross_sections=generic_pdk.cross_sections,
+        layer_views=generic_pdk.layer_views,
+        cells=generic_pdk.cells,
+    )
+
+
+def activate_noems_pdk() -> gf.Pdk:
+    """Activates the NOEMS PDK unless it is active already, and returns it.
+
+    Cheap enough to call before every build, e.g. as the initializer of build_components.
+    """
+    pdk = get_noems_pdk()
+    try:
+        active = gf.get_active_pdk()
+    except ValueError:  # no PDK active yet
+        active = None
+    if active is not pdk:
+        pdk.activate()
+    return pdk
+
+
+_layer_indexes: dict = {}
+
+
+def noems_layer(layer) -> int:
+    """gf.get_layer for the NOEMS layers, a dict lookup after the first call per layer.
+
+    Layer names are resolved with NOEMS_LayerMap, whatever PDK is active.
+    """
+    try:
+        return _layer_indexes[layer]
+    except KeyError:
+        index = gf.get_layer(NOEMS_LAYERS.get(layer, layer) if isinstance(layer, str) else layer)
+        _layer_indexes[layer] = index
+        return index
+    except TypeError:  # unhashable, e.g. a [layer, datatype] list
+        return gf.get_layer(layer)
@@ -0,0 +1,119 @@
+import contextlib
+import functools
+import inspect
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import gdsfactory as gf
+import pandas as pd
+
+from .cell_cache import _is_local, _local_modules
+
+
+class CellProfile:
+    """Per-cell-function build statistics collected by profile_cells.
+
+    A call counts as a cache hit when it creates no new cell in the layout,
+    i.e. it was answered by gf.cell's cache (or the in-memory part of the cell
+    store). Polygons and instances are the shapes and instances placed directly
+    in the cells built by the misses.
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(
+            lambda: {"calls": 0, "hits": 0, "misses": 0, "inclusive": 0.0, "exclusive": 0.0, "polygons": 0, "instances": 0}
+        )
+        # call stack (tuple of function names) -> exclusive seconds
+        self.stacks = defaultdict(float)
+        self._stack = []  # [name, seconds spent in children]
+
+    def _wrap(self, func, name):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            layout = gf.kcl.layout
+            recursive = any(frame[0] == name for frame in self._stack)
+            self._stack.append([name, 0.0])
+            cells = layout.cells()
+            start = time.perf_counter()
+            try:
+                return_value = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack = tuple(frame[0] for frame in self._stack)
+                _, children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+                stats = self.stats[name]
+                stats["calls"] += 1
+                if not recursive:
+                    stats["inclusive"] += elapsed
+                stats["exclusive"] += elapsed - children
+                self.stacks[stack] += elapsed - children
+            if layout.cells() == cells:
+                stats["hits"] += 1
+            else:
+                stats["misses"] += 1
+                cell = return_value.kdb_cell
+                stats["polygons"] += sum(cell.shapes(layer_index).size() for layer_index in layout.layer_indexes())
+                stats["instances"] += cell.child_instances()
+            return return_value
+
+        wrapper.is_profiled_cell = True
+        return wrapper
+
+    def dataframe(self) -> pd.DataFrame:
+        """One row per cell function, slowest (exclusive time) first. Times in seconds."""
+        df = pd.DataFrame.from_dict(dict(self.stats), orient="index")
+        if df.empty:
+            return df
+        df.index.name = "function"
+        return df.sort_values("exclusive", ascending=False)
+
+    def folded(self) -> str:
+        """The call tree in folded stack format, one `a;b;c <microseconds>` line per stack."""
+        return "".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}\n" for stack, seconds in sorted(self.stacks.items())
+        )
+
+    def write_flamegraph(self, path) -> Path:
+        """Writes folded() to path, for flamegraph.pl, speedscope or inferno."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded())
+        return path
+
+
+@contextlib.contextmanager
+def profile_cells(namespaces=()):
+    """Profiles the gf.cell functions of blocks and comb_drive_tuning while active.
+
+    The functions are replaced in every local module namespace (and in
+    namespaces) like enable_cell_cache does, and put back on exit. References
+    taken before (e.g. partials created at import time) are not profiled.
+
+        with profile_cells() as profile:
+            chip = build_chip()
+        profile.dataframe()
+        profile.write_flamegraph("build.folded")
+
+    Args:
+        namespaces: More namespace dicts to patch, e.g. globals() of a notebook.
+    """
+    profile = CellProfile()
+    wrappers = {}
+    patched = []
+    for namespace in [vars(module) for module in _local_modules()] + list(namespaces):
+        for name, obj in list(namespace.items()):
+            if not getattr(obj, "is_gf_cell", False) or getattr(obj, "is_profiled_cell", False) or not _is_local(obj):
+                continue
+            if obj not in wrappers:
+                f = inspect.unwrap(obj)
+                wrappers[obj] = profile._wrap(obj, f"{f.__module__}.{f.__qualname__}")
+            patched.append((namespace, name, obj))
+            namespace[name] = wrappers[obj]
+    try:
+        yield profile
+    finally:
+        for namespace, name, obj in patched:
+            namespace[name] = obj
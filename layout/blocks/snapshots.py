@@ -0,0 +1,143 @@
+import importlib
+import json
+from pathlib import Path
+
+import gdsfactory as gf
+
+from .actuation import combdrive_fingers
+from .cell_cache import CELL_CACHE_DIR, _Uncacheable, cell_key, geometry_hash
+from .pdk import activate_noems_pdk
+from .springs import spring_anchor_outside, spring_pair, spring_pair_anchor_outside, spring_with_truss
+from .truss import truss, truss_v2
+from .utils import create_deep_etch_mask
+
+# reviewed geometry hashes, commit this file after update_snapshots
+SNAPSHOT_BASELINE = Path(__file__).with_name("snapshots.json")
+# cell_key -> geometry hashes of the cases built so far
+SNAPSHOT_CACHE = CELL_CACHE_DIR.parent / "snapshots.json"
+# case name -> (function returning a component, kwargs)
+SNAPSHOT_CASES: dict[str, tuple] = {}
+# modules outside blocks that register their own cases, imported before the cases are built
+SNAPSHOT_MODULES = ("comb_drive_tuning",)
+# baseline entry recording the PDK the hashes were made with
+_PDK_KEY = "_pdk"
+
+
+def register_snapshot(name, func, **kwargs) -> None:
+    """Adds func(**kwargs) to the blocks checked by check_snapshots under name."""
+    SNAPSHOT_CASES[name] = (func, kwargs)
+
+
+def _read_json(path) -> dict:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_json(path, data) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n")
+
+
+def _pdk_record() -> dict:
+    """Name and name -> [layer, datatype] table of the active PDK."""
+    pdk = gf.get_active_pdk()
+    layers = sorted(pdk.layers, key=lambda layer: layer.name)
+    return {"name": pdk.name, "layers": {layer.name: [int(layer.layer), int(layer.datatype)] for layer in layers}}
+
+
+def snapshot_hashes(names=None, cache=SNAPSHOT_CACHE) -> dict[str, dict[str, str]]:
+    """Geometry hashes of the registered cases (all of them by default).
+
+    The cases are built with the NOEMS PDK. A case is only built if its cell_key,
+    which covers the source of the block and of everything it calls, the
+    parameters, the layer map and the gdsfactory version, is not in the cache
+    yet. Pass cache=None to build everything.
+    """
+    activate_noems_pdk()
+    for module in SNAPSHOT_MODULES:
+        importlib.import_module(module)
+    stored = _read_json(cache) if cache else {}
+    hashes = {}
+    for name in names or SNAPSHOT_CASES:
+        func, kwargs = SNAPSHOT_CASES[name]
+        try:
+            key = cell_key(func, (), kwargs)
+        except _Uncacheable:
+            key = None
+        if key not in stored:
+            hashes[name] = geometry_hash(func(**kwargs))
+            if key is not None:
+                stored[key] = hashes[name]
+        else:
+            hashes[name] = stored[key]
+    if cache:
+        _write_json(cache, stored)
+    return hashes
+
+
+def check_snapshots(names=None, baseline=SNAPSHOT_BASELINE, cache=SNAPSHOT_CACHE) -> dict[str, dict]:
+    """Compares the geometry of the registered cases with the baseline.
+
+    Returns:
+        case name -> {layer: (baseline hash, current hash)} for the cases whose
+        geometry changed, empty if everything matches. A case or layer missing
+        on one side shows up with None. A PDK other than the one of the baseline
+        shows up as "_pdk" -> {"name" or "layers": (baseline, current)}.
+    """
+    expected = _read_json(baseline)
+    differences = {}
+    hashes_by_name = snapshot_hashes(names, cache)
+    recorded, current = expected.get(_PDK_KEY, {}), _pdk_record()
+    changed = {key: (recorded.get(key), current[key]) for key in current if recorded.get(key) != current[key]}
+    if changed:
+        differences[_PDK_KEY] = changed
+    for name, hashes in hashes_by_name.items():
+        reference = expected.get(name, {})
+        changed = {
+            layer: (reference.get(layer), hashes.get(layer))
+            for layer in sorted(set(reference) | set(hashes))
+            if reference.get(layer) != hashes.get(layer)
+        }
+        if changed:
+            differences[name] = changed
+    return differences
+
+
+def update_snapshots(names=None, baseline=SNAPSHOT_BASELINE, cache=SNAPSHOT_CACHE) -> dict[str, dict[str, str]]:
+    """Stores the current hashes of the cases (all by default) and the PDK as the baseline."""
+    expected = _read_json(baseline)
+    hashes = snapshot_hashes(names, cache)
+    if names is None:
+        expected = {}
+    expected.update(hashes)
+    expected[_PDK_KEY] = _pdk_record()
+    _write_json(baseline, expected)
+    return hashes
+
+
+@gf.cell
+def _deep_etch_mask_case(method="polygon", mask_offset=1, core_layer="WG"):
+    """A small L-shaped core with create_deep_etch_mask applied."""
+    c = gf.Component()
+    layer = core_layer[0] if isinstance(core_layer, list) else core_layer
+    c.add_polygon([(0, 0), (20, 0), (20, 5), (5, 5), (5, 15), (0, 15)], layer=layer)
+    create_deep_etch_mask(c, method=method, mask_offset=mask_offset, core_layer=core_layer)
+    return c
+
+
+register_snapshot("truss", truss, width=0.5, size=5, mxn=(3, 4))
+register_snapshot("truss_open", truss, width=0.5, size=5, mxn=(2, 3), open=["left", "top"])
+register_snapshot("truss_v2", truss_v2, width=0.5, size=5, mxn=(3, 4))
+register_snapshot("truss_v2_open", truss_v2, width=0.5, size=5, mxn=(2, 3), open=["right", "bottom"])
+register_snapshot("spring_with_truss", spring_with_truss)
+register_snapshot("spring_anchor_outside", spring_anchor_outside)
+register_snapshot("spring_anchor_outside_right", spring_anchor_outside, open=["right"])
+register_snapshot("spring_pair", spring_pair)
+register_snapshot("spring_pair_anchor_outside", spring_pair_anchor_outside)
+register_snapshot("combdrive_fingers", combdrive_fingers, fingers=7)
+register_snapshot("combdrive_fingers_arrayed", combdrive_fingers, fingers=7, arrayed=True)
+register_snapshot("combdrive_fingers_base", combdrive_fingers, fingers=4, base_length=40, with_mask=True)
+register_snapshot("deep_etch_mask_polygon", _deep_etch_mask_case)
+register_snapshot("deep_etch_mask_bbox", _deep_etch_mask_case, method="bbox", mask_offset=2)
+register_snapshot("deep_etch_mask_layer_list", _deep_etch_mask_case, core_layer=["WG", "SLAB90"])
@@ -1,5 +1,6 @@
 import gdsfactory as gf
-from blocks import truss, create_deep_etch_mask, truss_v2
+from .truss import truss, truss_v2
+from .utils import create_deep_etch_mask
 from typing import Literal
 from math import ceil
 
@@ -88,7 +89,7 @@ def spring_anchor_outside(spring_width=0.16, spring_length=20, spring_separation
         return c
     
     def shuttle_frame(n1,n2,n3):
-        from blocks.truss import _truss_core
+        from .truss import _truss_core
         truss_width = 0.16
         c = gf.Component()
         truss_11 = c << _truss_core(truss_width, 1, (1, n1))
@@ -0,0 +1,127 @@
+import itertools
+from typing import Callable
+
+import gdsfactory as gf
+import numpy as np
+import pandas as pd
+
+from .parallel import build_components
+from .utils import labelme_batch
+
+
+def sweep_parameters(grid: dict, fixed: dict | None = None) -> list[dict]:
+    """Keyword arguments for every combination of the grid values, the first key varying slowest."""
+    fixed = fixed or {}
+    return [
+        {**fixed, **dict(zip(grid, values))}
+        for values in itertools.product(*grid.values())
+    ]
+
+
+def _grid_positions(sizes, columns, pitch, spacing):
+    """(n, 2) lower left corners of the grid cells, rows going up.
+
+    With a pitch every cell gets the same size, otherwise each column is as wide
+    and each row as high as its largest element plus spacing.
+    """
+    n = len(sizes)
+    index = np.arange(n)
+    col, row = index % columns, index // columns
+    if pitch is not None:
+        return np.column_stack([col * pitch[0], row * pitch[1]]).astype(float)
+    widths = np.zeros(columns)
+    heights = np.zeros(row[-1] + 1)
+    np.maximum.at(widths, col, sizes[:, 0])
+    np.maximum.at(heights, row, sizes[:, 1])
+    col_x = np.concatenate([[0], np.cumsum(widths + spacing[0])[:-1]])
+    row_y = np.concatenate([[0], np.cumsum(heights + spacing[1])[:-1]])
+    return np.column_stack([col_x[col], row_y[row]])
+
+
+def parameter_sweep(
+    component_spec,
+    grid: dict,
+    *,
+    fixed: dict | None = None,
+    c: gf.Component | None = None,
+    columns: int | None = None,
+    pitch: tuple[float, float] | None = None,
+    spacing: tuple[float, float] = (50, 50),
+    label: str | Callable[[dict], str] | None = None,
+    label_position=lambda c_ref: (c_ref.xmin, c_ref.ymin - 20),
+    label_anchor="NW",
+    text_spec=gf.components.text_freetype,
+    processes=None,
+    csvpath=None,
+) -> tuple[gf.Component, pd.DataFrame]:
+    """Builds component_spec for every point of a parameter grid and lays the results out.
+
+    Args:
+        component_spec: Picklable component function, e.g. a module level gf.cell.
+        grid: Parameter name -> values; all combinations are built, the first parameter varying slowest.
+        fixed: Keyword arguments passed to every build.
+        c: Component to place the sweep in. Defaults to a new component.
+        columns: Number of columns. Defaults to the number of values of the last grid parameter.
+        pitch: (x, y) pitch of the grid, with the instance origins on the grid points.
+            If None the cells are packed by their measured bboxes.
+        spacing: (x, y) space between bboxes if pitch is None.
+        label: Format string with the parameter names (e.g. "l={length}um"), or a
+            function of the parameter dict. No labels if None.
+        label_position: Label position relative to each instance, see labelme.
+        label_anchor: Label anchor, see labelme.
+        text_spec: Text component for the labels.
+        processes: Worker processes to build the cells in, see build_components.
+        csvpath: Also write the table to this csv file.
+
+    Returns:
+        The component and a DataFrame with one row per cell: the parameters, the label,
+        the cell name, the instance position and bbox, and the cell info.
+    """
+    kwargs_list = sweep_parameters(grid, fixed)
+    components = build_components(component_spec, kwargs_list, processes=processes)
+    if c is None:
+        c = gf.Component()
+    if columns is None:
+        columns = len(list(grid.values())[-1])
+
+    boxes = np.array([(comp.xmin, comp.ymin, comp.xmax, comp.ymax) for comp in components])
+    corners = _grid_positions(boxes[:, 2:] - boxes[:, :2], columns, pitch, spacing)
+    # with a pitch the origins go on the grid points, otherwise the bbox corners
+    positions = corners if pitch is not None else corners - boxes[:, :2]
+
+    refs = []
+    for comp, (x, y) in zip(components, positions):
+        ref = c.add_ref(comp)
+        ref.move((x, y))
+        refs.append(ref)
+
+    texts = [None] * len(kwargs_list)
+    if label is not None:
+        format_label = label.format_map if isinstance(label, str) else label
+        texts = [format_label(kwargs) for kwargs in kwargs_list]
+        labelme_batch(
+            c,
+            [(ref, text, label_position, label_anchor) for ref, text in zip(refs, texts)],
+            text_spec=text_spec,
+        )
+
+    placed = boxes + np.tile(positions, 2)
+    rows = []
+    for i, (kwargs, comp) in enumerate(zip(kwargs_list, components)):
+        row = {
+            **kwargs,
+            "label": texts[i],
+            "cell": comp.name,
+            "x": positions[i, 0],
+            "y": positions[i, 1],
+            "xmin": placed[i, 0],
+            "ymin": placed[i, 1],
+            "xmax": placed[i, 2],
+            "ymax": placed[i, 3],
+        }
+        row.update({key: value for key, value in comp.info.model_dump().items() if key not in row})
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    if csvpath is not None:
+        df.to_csv(csvpath, index=False)
+    return c, df
@@ -1,4 +1,4 @@
-from blocks import create_deep_etch_mask
+from .utils import create_deep_etch_mask
 import gdsfactory as gf
 
 @gf.cell
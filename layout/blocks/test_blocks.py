@@ -1,31 +1,174 @@
 import gdsfactory as gf
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
+from pathlib import Path
+from typing import Literal
 from .mylib import waveguide_inv_extrude
+from .parallel import build_components, build_process_count, import_component, write_component_gds
 from .cross_section import cross_section_with_sleeves
 from .taper import taper_rib_to_strip
 
 
+def _straight_length(port1, port2):
+    """Distance (dbu) from port1 to port2 if they face each other on one line, else None."""
+    relative = port1.trans.inverted() * port2.trans
+    if relative.angle == 2 and relative.disp.y == 0 and relative.disp.x > 0 and port1.width == port2.width:
+        return relative.disp.x
+    return None
+
+
+def _add_straight(c, xs, port, length):
+    """Adds a straight of length (dbu) of cross-section xs to c, starting at port.
+
+    Cross-sections made of constant sections (like cross_section_with_sleeves)
+    are drawn as one box per section, which is much cheaper than a straight cell
+    per length. Anything else gets a gf.components.straight reference.
+    """
+    plain = not (xs.bbox_layers or xs.components_along_path) and all(
+        section.width_function is None and section.offset_function is None and not section.insets
+        for section in xs.sections
+    )
+    if not plain:
+        straight_ref = c << gf.components.straight(length=length * c.kcl.dbu, cross_section=xs)
+        straight_ref.connect("o1", port)
+        return
+    for section in xs.sections:
+        if section.hidden:
+            continue
+        box = gf.kdb.DBox(0, section.offset - section.width / 2, length * c.kcl.dbu, section.offset + section.width / 2)
+        c.add_polygon(port.dcplx_trans * gf.kdb.DPolygon(box), layer=section.layer)
+
+
+def _bundles(ports1, ports2, indexes):
+    """Splits the pairs indexes into bundles that route_bundle can route without crossings.
+
+    The pairs are grouped by the side their ports face and sorted along the bundle
+    axis (y for ports facing east or west, x otherwise). A bundle only takes pairs
+    whose start and end positions both strictly increase along the axis, so the
+    routes keep their order from one end to the other.
+    """
+    groups: dict[tuple[int, int], list[int]] = {}
+    for i in indexes:
+        groups.setdefault((ports1[i].trans.angle, ports2[i].trans.angle), []).append(i)
+    bundles = []
+    for (angle, _), group in sorted(groups.items()):
+        axis = 1 if angle % 2 == 0 else 0
+
+        def position(port):
+            disp = port.trans.disp
+            return (disp.y, disp.x) if axis else (disp.x, disp.y)
+
+        chains: list[list[int]] = []
+        for i in sorted(group, key=lambda i: (position(ports1[i]), position(ports2[i]))):
+            for chain in chains:
+                last = chain[-1]
+                if position(ports1[last])[0] < position(ports1[i])[0] and position(ports2[last])[0] < position(ports2[i])[0]:
+                    chain.append(i)
+                    break
+            else:
+                chains.append([i])
+        bundles += chains
+    return bundles
+
+
 @gf.cell
-def _device_with_io(device_spec, coupler_spec, pitch, lateral_offset=0, cs=None):
+def device_with_io_array(
+    device_spec,
+    coupler_spec,
+    cross_section,
+    placements,
+    route_mode: Literal["single", "bundle"] = "single",
+    bend="bend_euler",
+):
+    """Places many devices with a grating coupler on each side and routes them in one pass.
+
+    Every entry of placements is (pitch, lateral_offset, (x, y)) in um and places one
+    device: the coupler is put at x = pitch / 2 and, mirrored, at x = -pitch / 2, the
+    device is moved up by lateral_offset, and all three are moved by (x, y). The left
+    coupler is routed to o1 of the device, the right one to o2. The device, the
+    coupler and the bend are built once and shared by all routes.
+
+    Pairs whose ports face each other on one line (no lateral offset) get a straight
+    directly with _add_straight, without the router. This is the same geometry
+    route_single makes.
+
+    Args:
+        device_spec: Device with ports o1 and o2.
+        coupler_spec: Grating coupler with port o1.
+        cross_section: Cross-section used for the routes.
+        placements: Sequence of (pitch, lateral_offset, (x, y)).
+        route_mode: "single" routes the remaining pairs with one route_single call
+            each. "bundle" routes them with one route_bundle call per bundle, see
+            _bundles.
+        bend: Bend spec used for the routes.
+
+    The routing report is stored in c.info['routing_report'] as one dict per route,
+    in placement order, with the route length (um) and the number of 90 degree bends.
+    """
+    if route_mode not in ("single", "bundle"):
+        raise ValueError(f"Unknown route_mode {route_mode!r}, use 'single' or 'bundle'")
     c = gf.Component()
-    device = c << device_spec()
-    coupler_left = c << coupler_spec()
-    coupler_right = c << coupler_spec()
-    coupler_left.dmirror_x()
-    coupler_left.dmovex(-pitch / 2)
-    coupler_right.dmovex(pitch / 2)
-    device.movey(lateral_offset)
-    route_left = gf.routing.route_single(
-        c, coupler_left.ports["o1"], device.ports["o1"], cross_section=cs
-    )
-    route_right = gf.routing.route_single(
-        c, coupler_right.ports["o1"], device.ports["o2"], cross_section=cs
-    )
+    device = device_spec()
+    coupler = coupler_spec()
+    xs = gf.get_cross_section(cross_section)
+    bend90 = gf.get_component(bend, cross_section=xs, radius=xs.radius)
+
+    ports1 = []
+    ports2 = []
+    for pitch, lateral_offset, position in placements:
+        device_ref = c << device
+        coupler_left = c << coupler
+        coupler_right = c << coupler
+        coupler_left.dmirror_x()
+        coupler_left.dmovex(-pitch / 2)
+        coupler_right.dmovex(pitch / 2)
+        device_ref.movey(lateral_offset)
+        for ref in (device_ref, coupler_left, coupler_right):
+            ref.move(position)
+        ports1 += [coupler_left.ports["o1"], coupler_right.ports["o1"]]
+        ports2 += [device_ref.ports["o1"], device_ref.ports["o2"]]
+
+    report = [None] * len(ports1)
+    routed = []
+    for i, (port1, port2) in enumerate(zip(ports1, ports2)):
+        length = _straight_length(port1, port2)
+        if length is None:
+            routed.append(i)
+            continue
+        _add_straight(c, xs, port1, length)
+        report[i] = (port1, port2, length, 0)
+
+    if route_mode == "single":
+        for i in routed:
+            route = gf.routing.route_single(c, ports1[i], ports2[i], cross_section=xs, bend=bend90)
+            report[i] = (route.start_port, route.end_port, route.length, route.n_bend90)
+    else:
+        for bundle in _bundles(ports1, ports2, routed):
+            routes = gf.routing.route_bundle(
+                c,
+                [ports1[i] for i in bundle],
+                [ports2[i] for i in bundle],
+                cross_section=xs,
+                bend=bend90,
+            )
+            for i, route in zip(bundle, routes):
+                report[i] = (route.start_port, route.end_port, route.length, route.n_bend90)
+
+    c.info["routing_report"] = [
+        {
+            "start": tuple(start.to_dtype().center),
+            "end": tuple(end.to_dtype().center),
+            "length": length / 1000,
+            "n_bend90": n_bend90,
+        }
+        for start, end, length, n_bend90 in report
+    ]
+    c.info["total_route_length"] = sum(r["length"] for r in c.info["routing_report"])
     return c
 
 
 @gf.cell
-def grating_coupler_test_block(gc_spec, cross_section):
+def grating_coupler_test_block(gc_spec, cross_section, route_mode: Literal["single", "bundle"] = "single"):
     extrude_wg = partial(
         waveguide_inv_extrude,
         width=0.43,
@@ -34,50 +177,58 @@ def grating_coupler_test_block(gc_spec, cross_section):
         sleeve_layer="DEEP_ETCH",
         core_layer="WG",
     )
+    # (pitch, lateral_offset, position) of every waveguide in the block
+    placements = [
+        (3000, 0, (0, 0)),
+        (2000, 0, (-500, 100)),
+        (1000, 0, (-1000, 200)),
+        (1500, 0, (750, 200)),
+        (500, 0, (1250, 100)),
+        (3000, 500, (0, 300)),
+        (2000, 400, (-300, 300)),
+        (1000, 300, (-600, 300)),
+    ]
     c = gf.Component()
-    wg_3k = c << _device_with_io(extrude_wg, gc_spec, pitch=3000, cs=cross_section)
-    wg_2k = c << _device_with_io(extrude_wg, gc_spec, pitch=2000, cs=cross_section)
-    wg_1k = c << _device_with_io(extrude_wg, gc_spec, pitch=1000, cs=cross_section)
-    wg_2k.movey(100)
-    wg_2k.movex(-500)
-    wg_1k.movey(200)
-    wg_1k.movex(-1000)
-    wg_1_5k = c << _device_with_io(extrude_wg, gc_spec, pitch=1500, cs=cross_section)
-    wg_1_5k.movey(200)
-    wg_1_5k.movex(750)
-    wg_500 = c << _device_with_io(extrude_wg, gc_spec, pitch=500, cs=cross_section)
-    wg_500.movey(100)
-    wg_500.movex(1250)
-    wg_3k_bend = c << _device_with_io(
-        extrude_wg, gc_spec, pitch=3000, lateral_offset=500, cs=cross_section
+    block = c << device_with_io_array(
+        extrude_wg, gc_spec, cross_section, placements, route_mode=route_mode
     )
-    wg_3k_bend.movey(300)
-    wg_2k_bend = c << _device_with_io(
-        extrude_wg, gc_spec, pitch=2000, lateral_offset=400, cs=cross_section
-    )
-    wg_2k_bend.move((-300, 300))
-    wg_1k_bend = c << _device_with_io(
-        extrude_wg, gc_spec, pitch=1000, lateral_offset=300, cs=cross_section
-    )
-    wg_1k_bend.move((-600, 300))
+    c.info["routing_report"] = block.cell.info["routing_report"]
 
     # c.flatten()
     return c
 
 @gf.cell
-def euler_test(n,grating_coupler_spec,cross_section):
-    
-    def bend180(bend90):
-        c = gf.Component()
-        b1 = c << bend90
-        b2 = c << bend90
-        b2.connect('o1',b1.ports['o2'])
-        # c << bend180
-        c.add_port(name='o1', port=b1.ports['o1'])
-        c.add_port(name='o2', port=b2.ports['o2'])
-        return c
-    bend90 = gf.components.bend_euler(cross_section=cross_section,angle=90)
-    bend180 = bend180(bend90)
+def _bend180(bend90):
+    c = gf.Component()
+    b1 = c << bend90
+    b2 = c << bend90
+    b2.connect('o1',b1.ports['o2'])
+    c.add_port(name='o1', port=b1.ports['o1'])
+    c.add_port(name='o2', port=b2.ports['o2'])
+    return c
+
+
+def _add_bend_serpentine(c, bend90, n, port):
+    """Adds 2n-1 alternating 180 degree bends to c, starting at port.
+
+    The mirrored and non-mirrored bends each repeat with a fixed pitch, so they are
+    placed as two regular arrays instead of 2n-1 connected references.
+    Returns the output port of the last bend.
+    """
+    bend180 = _bend180(bend90)
+    first = c << bend180
+    first.connect("o1", port, mirror=True)
+    if n == 1:
+        return first.ports["o2"]
+    second = c << bend180
+    second.connect("o1", first.ports["o2"])
+    pitch = second.ports["o2"].trans.disp - first.ports["o1"].trans.disp
+    first.a, first.na = pitch, n
+    second.a, second.na = pitch, n - 1
+    return first.ports["o2"].copy(gf.kdb.Trans((n - 1) * pitch))
+
+
+def _bend_test(n, bend90, grating_coupler_spec, cross_section):
     straight = gf.components.straight(length=50, cross_section=cross_section)
     c = gf.Component()
     gc_ref = (c << grating_coupler_spec()).rotate(180)
@@ -85,61 +236,118 @@ def euler_test(n,grating_coupler_spec,cross_section):
     straight_ref.connect("o1",gc_ref.ports["o1"])
     b90_ref = c << bend90
     b90_ref.connect("o1",straight_ref.ports["o2"])
-    for i in range(2*n-1):
-        b180_ref = c << bend180
-        if i==0:
-            b180_ref.connect("o1",b90_ref.ports["o2"], mirror=True)
-        elif i%2==1:
-            b180_ref.connect("o1",prev_b180_ref.ports["o2"])
-        else:
-            b180_ref.connect("o1",prev_b180_ref.ports["o2"],mirror=True)
-        prev_b180_ref = b180_ref
+    serpentine_end = _add_bend_serpentine(c, bend90, n, b90_ref.ports["o2"])
     b90_end = c << bend90
-    b90_end.connect("o1",prev_b180_ref.ports["o2"])
+    b90_end.connect("o1",serpentine_end)
     straight_end = c << straight
     straight_end.connect("o1",b90_end.ports["o2"])
     gc_end = c << grating_coupler_spec()
     gc_end.connect("o1",straight_end.ports["o2"])
     c.info['num_bends'] = (2*n-1)*2 + 2
     return c
+
+
+@gf.cell
+def euler_test(n,grating_coupler_spec,cross_section):
+    bend90 = gf.components.bend_euler(cross_section=cross_section,angle=90)
+    return _bend_test(n, bend90, grating_coupler_spec, cross_section)
+
+
 @gf.cell
 def circular_bend_test(n,radius,grating_coupler_spec,cross_section):
-    
-    def bend180(bend90):
-        c = gf.Component()
-        b1 = c << bend90
-        b2 = c << bend90
-        b2.connect('o1',b1.ports['o2'])
-        # c << bend180
-        c.add_port(name='o1', port=b1.ports['o1'])
-        c.add_port(name='o2', port=b2.ports['o2'])
-        return c
     bend90 = gf.components.bend_circular(radius=radius,cross_section=cross_section,angle=90)
-    bend180 = bend180(bend90)
-    straight = gf.components.straight(length=50, cross_section=cross_section)
-    c = gf.Component()
-    gc_ref = (c << grating_coupler_spec()).rotate(180)
-    straight_ref = c << straight
-    straight_ref.connect("o1",gc_ref.ports["o1"])
-    b90_ref = c << bend90
-    b90_ref.connect("o1",straight_ref.ports["o2"])
-    for i in range(2*n-1):
-        b180_ref = c << bend180
-        if i==0:
-            b180_ref.connect("o1",b90_ref.ports["o2"], mirror=True)
-        elif i%2==1:
-            b180_ref.connect("o1",prev_b180_ref.ports["o2"])
-        else:
-            b180_ref.connect("o1",prev_b180_ref.ports["o2"],mirror=True)
-        prev_b180_ref = b180_ref
-    b90_end = c << bend90
-    b90_end.connect("o1",prev_b180_ref.ports["o2"])
-    straight_end = c << straight
-    straight_end.connect("o1",b90_end.ports["o2"])
-    gc_end = c << grating_coupler_spec()
-    gc_end.connect("o1",straight_end.ports["o2"])
-    c.info['num_bends'] = (2*n-1)*2 + 2
-    return c
+    return _bend_test(n, bend90, grating_coupler_spec, cross_section)
+
+
+SPIRAL_CACHE_DIR = gf.config.PATH.gdslib / "noems_cache" / "spirals"
+
+
+def _resolve_cross_section_layers(cross_section):
+    """Returns the cross-section with every section layer as a (layer, datatype) tuple.
+
+    Worker processes may not have the NOEMS layer map active, and the resolved
+    cross-section name is a stable key for the disk cache.
+    """
+    xs = gf.get_cross_section(cross_section)
+    sections = [section.model_copy(update={"layer": gf.get_layer_tuple(section.layer)}) for section in xs.sections]
+    return xs.copy(sections=sections)
+
+
+def _spiral_gds_path(cross_section, length, n_straight_sections, in_out_port_spacing, cache_dir):
+    name = f"{cross_section.name}_L{length}_N{n_straight_sections}_S{in_out_port_spacing}_gf{gf.__version__}.gds"
+    return Path(cache_dir) / name
+
+
+def _spiral_kwargs(cross_section, length, n_straight_sections, in_out_port_spacing):
+    return dict(
+        cross_section=cross_section,
+        length=length,
+        n_straight_sections=n_straight_sections,
+        in_out_port_spacing=in_out_port_spacing,
+    )
+
+
+def cached_spiral(cross_section, length, n_straight_sections, in_out_port_spacing=600, cache_dir=None) -> gf.Component:
+    """spiral_racetrack_fixed_length loaded from the disk cache, built and stored on a miss.
+
+    The cache key is (cross-section name, length, n_straight_sections, in_out_port_spacing).
+    The spiral keeps the cell name spiral_racetrack_fixed_length gives it, wherever
+    the cache is.
+
+    Args:
+        cache_dir: Directory of the disk cache. Defaults to SPIRAL_CACHE_DIR.
+    """
+    xs = _resolve_cross_section_layers(cross_section)
+    gdspath = _spiral_gds_path(xs, length, n_straight_sections, in_out_port_spacing, cache_dir or SPIRAL_CACHE_DIR)
+    if not gdspath.exists():
+        gdspath.parent.mkdir(parents=True, exist_ok=True)
+        write_component_gds(
+            gf.components.spiral_racetrack_fixed_length,
+            _spiral_kwargs(xs, length, n_straight_sections, in_out_port_spacing),
+            gdspath,
+        )
+    return import_component(gdspath)
+
+
+def build_spirals(cross_section, specs, in_out_port_spacing=600, processes=None, cache_dir=None):
+    """Returns one cached_spiral per (length, n_straight_sections) in specs.
+
+    Spirals missing from the disk cache are built in parallel worker processes first.
+
+    Args:
+        cross_section: Cross-section of the spirals.
+        specs: Sequence of (length, n_straight_sections).
+        in_out_port_spacing: Spacing between the input and output ports.
+        processes: Number of worker processes, see build_process_count.
+            With processes=1 the spirals are built in this process.
+        cache_dir: Directory of the disk cache. Defaults to SPIRAL_CACHE_DIR.
+    """
+    cache_dir = Path(cache_dir or SPIRAL_CACHE_DIR)
+    processes = build_process_count(processes)
+    xs = _resolve_cross_section_layers(cross_section)
+    missing = [
+        (length, n)
+        for length, n in specs
+        if not _spiral_gds_path(xs, length, n, in_out_port_spacing, cache_dir).exists()
+    ]
+    if len(missing) > 1 and processes > 1:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=min(len(missing), processes)) as pool:
+            futures = [
+                pool.submit(
+                    write_component_gds,
+                    gf.components.spiral_racetrack_fixed_length,
+                    _spiral_kwargs(xs, length, n, in_out_port_spacing),
+                    _spiral_gds_path(xs, length, n, in_out_port_spacing, cache_dir),
+                )
+                for length, n in missing
+            ]
+            for future in futures:
+                future.result()
+    return [
+        cached_spiral(xs, length, n, in_out_port_spacing=in_out_port_spacing, cache_dir=cache_dir)
+        for length, n in specs
+    ]
 
 
 @gf.cell
@@ -147,17 +355,18 @@ def spiral_test(grating_coupler_spec,cross_section):
     '''Creates a component with multiple spirals of different lengths,
        Use xs = cross_section_with_sleeves(core_width=0.43, total_width=5, radius=50,radius_min=10)
        The length is fixed to be 2000, 9100, 15000, and 35000 um,
+       Spirals are built in parallel and cached on disk, see build_spirals. The
+       worker count is set with build_processes, the cache directory is SPIRAL_CACHE_DIR.
     '''
     c = gf.Component()
-    spiral_list = [
-        gf.components.spiral_racetrack_fixed_length(cross_section=cross_section,length=2000,n_straight_sections=4,in_out_port_spacing=600),
-        gf.components.spiral_racetrack_fixed_length(cross_section=cross_section,length=9100,n_straight_sections=22,in_out_port_spacing=600),
-        gf.components.spiral_racetrack_fixed_length(cross_section=cross_section,length=15000,n_straight_sections=34,in_out_port_spacing=600),
-        gf.components.spiral_racetrack_fixed_length(cross_section=cross_section,length=35000,n_straight_sections=64,in_out_port_spacing=600)
-    ]
+    spiral_list = build_spirals(
+        cross_section,
+        [(2000, 4), (9100, 22), (15000, 34), (35000, 64)],
+        in_out_port_spacing=600,
+    )
     straight_100 = gf.components.straight(length=100, cross_section=cross_section)
+    gc = grating_coupler_spec()
     for i, spiral in enumerate(spiral_list):
-        gc = grating_coupler_spec()
         gc_ref = (c << gc).rotate(180)
         spiral_ref = c << spiral
         # create a 100um straight from 1st gc.
@@ -177,46 +386,75 @@ def spiral_test(grating_coupler_spec,cross_section):
     c.info["Spiral lengths"] = [2100, 9200, 15100, 35100]
     return c
 
+@gf.cell
+def _converter_pair(wg_width=0.43, slab_width=6, taper_length=20, deep_etch_layer="DEEP_ETCH"):
+    """One taper/straight/taper period of converter_test."""
+    c = gf.Component()
+    xs_rib = cross_section_with_sleeves(core_width=wg_width, total_width=slab_width, sleeve_layer=deep_etch_layer)
+    straight = gf.components.straight(length=10, cross_section=xs_rib)
+    taper = taper_rib_to_strip(width1=wg_width,width2=wg_width,w_slab1=wg_width,w_slab2=slab_width,length=taper_length,deep_etch_layer=deep_etch_layer)
+    taper1 = c << taper
+    straight_mid_ref = c << straight
+    straight_mid_ref.connect("o1",taper1.ports["o1"])
+    taper2 = c << taper
+    taper2.connect("o1",straight_mid_ref.ports["o2"])
+    c.add_port(name="o1", port=taper1.ports["o2"])
+    c.add_port(name="o2", port=taper2.ports["o2"])
+    return c
+
+
 @gf.cell
 def converter_test(grating_coupler_spec, wg_width=0.43, slab_width=6, taper_length=20, num_taper_pair=2,deep_etch_layer="DEEP_ETCH"):
+    """Grating coupler loop with num_taper_pair rib/strip converter pairs.
+
+    The pairs and the straights between them are placed as two regular arrays of
+    cached cells, so the taper boolean runs once for any num_taper_pair.
+    """
     c = gf.Component()
     gc = grating_coupler_spec()
     gc_ref = (c << gc).rotate(180)
     xs_rib = cross_section_with_sleeves(core_width=wg_width, total_width=slab_width, sleeve_layer=deep_etch_layer)
     straight = gf.components.straight(length=10, cross_section=xs_rib)
-    prev_straight = gc_ref
-    for i in range(num_taper_pair):
-        taper1 = c << taper_rib_to_strip(width1=wg_width,width2=wg_width,w_slab1=wg_width,w_slab2=slab_width,length=taper_length,deep_etch_layer=deep_etch_layer)
-        taper1.connect("o2",prev_straight.ports["o1"] if i==0 else prev_straight.ports["o2"])
-        straight_mid_ref =c << straight
-        straight_mid_ref.connect("o1",taper1.ports["o1"])
-        taper2 = c << taper_rib_to_strip(width1=wg_width,width2=wg_width,w_slab1=wg_width,w_slab2=slab_width,length=taper_length,deep_etch_layer=deep_etch_layer)
-        taper2.connect("o1",straight_mid_ref.ports["o2"])
-        if i != num_taper_pair-1:
-            straight_post = c << straight
-            straight_post.connect("o1",taper2.ports["o2"])
-            prev_straight = straight_post
-        else:
-            prev_straight = taper2
+    pair = _converter_pair(wg_width=wg_width, slab_width=slab_width, taper_length=taper_length, deep_etch_layer=deep_etch_layer)
+    pair_ref = c << pair
+    pair_ref.connect("o1",gc_ref.ports["o1"])
+    end_port = pair_ref.ports["o2"]
+    if num_taper_pair > 1:
+        straight_post = c << straight
+        straight_post.connect("o1",pair_ref.ports["o2"])
+        pitch = straight_post.ports["o2"].trans.disp - pair_ref.ports["o1"].trans.disp
+        pair_ref.a, pair_ref.na = pitch, num_taper_pair
+        straight_post.a, straight_post.na = pitch, num_taper_pair - 1
+        end_port = end_port.copy(gf.kdb.Trans((num_taper_pair - 1) * pitch))
     gc_end = c << gc
-    gc_end.connect("o1",prev_straight.ports["o2"])
+    gc_end.connect("o1",end_port)
     return c
 
+def _add_test_array_children(c, component_spec, kwargs_list, pitch):
+    """Builds component_spec(**kwargs) for every kwargs in parallel and stacks them in c.
+
+    Child i is moved by (0, i * pitch). The worker count is set with build_processes,
+    see build_components.
+    """
+    children = build_components(component_spec, kwargs_list)
+    return [(c << child).movey(i * pitch) for i, child in enumerate(children)]
+
+
 @gf.cell
 def converter_test_array(converter_test_spec, pair_num_list=[20,40,60,80], deep_etch_layer="DEEP_ETCH"):
     c = gf.Component()
-    for i, pair_num in enumerate(pair_num_list):
-        inst = c << converter_test_spec(num_taper_pair=pair_num, deep_etch_layer=deep_etch_layer)
-        inst.movey(-120*i)
+    _add_test_array_children(
+        c,
+        converter_test_spec,
+        [dict(num_taper_pair=pair_num, deep_etch_layer=deep_etch_layer) for pair_num in pair_num_list],
+        pitch=-120,
+    )
     c.info['pair_num_list'] = pair_num_list
     return c
 
 @gf.cell
 def euler_bend_test_array(bend_spec, n_bend_list=[5,10,15]):
     c = gf.Component()
-    for i, n_bend in enumerate(n_bend_list):
-        inst = c << bend_spec(n=n_bend)
-        inst.movey(-200*i)
+    _add_test_array_children(c, bend_spec, [dict(n=n_bend) for n_bend in n_bend_list], pitch=-200)
     c.info['n_bend_list'] = n_bend_list
     return c
-
@@ -1,5 +1,9 @@
+from functools import partial
 from typing import Callable, Literal, Union
 import gdsfactory as gf
+import numpy as np
+from .mylib import text_glyph_placements
+from .pdk import noems_layer
 
 
 def create_deep_etch_mask(
@@ -17,7 +21,7 @@ def create_deep_etch_mask(
     
     c_tmp = gf.Component()
     if isinstance(core_layer, list):
-        layer_list = [gf.get_layer(layer) for layer in core_layer]
+        layer_list = [noems_layer(layer) for layer in core_layer]
         polygons = {layer: poly_list for layer, poly_list in c.get_polygons().items() if layer in layer_list}
         # combine all polygons to temp layer
         for layer, poly_list in polygons.items():
@@ -65,7 +69,7 @@ def tmp_merge_deep_etch_mask(c) -> gf.Component:
     new_c = gf.Component()
     booled_deepetch = gf.boolean(c, c, "not", "DEEP_ETCH", "DEEP_ETCH", "WG")
     new_c << booled_deepetch
-    layers_extract = [layer for layer in c.layers if gf.get_layer(layer) != gf.get_layer("DEEP_ETCH")]
+    layers_extract = [layer for layer in c.layers if noems_layer(layer) != noems_layer("DEEP_ETCH")]
     new_c << c.extract(layers=layers_extract)
     
     new_c.ports = c.ports
@@ -92,7 +96,7 @@ def merge_layers_with_priority(
         component: The source component to process.
         priority: Dictionary mapping layers to priority values (higher value = higher priority).example: {'WG': 3, 'PADDING': 2, 'DEEP_ETCH': 1}
     """
-    get_layer = gf.get_layer
+    get_layer = noems_layer
     polys = component.get_polygons()
     target_layers = [l for l in  polys.keys()]
 
@@ -211,4 +215,88 @@ def labelme(
     # Move text using move (origin is reference point, destination is target point)
     text_ref.move(origin=anchor_point, destination=destination)
     
-    return text_ref
\ No newline at end of file
+    return text_ref
+
+# (x, y) weights between the (left, bottom) and (right, top) corners of a bbox
+_ANCHOR_WEIGHTS = {
+    "SW": (0, 0),
+    "SE": (1, 0),
+    "NW": (0, 1),
+    "NE": (1, 1),
+    "center": (0.5, 0.5),
+}
+
+
+def _text_freetype_kwargs(text_spec):
+    """Keyword arguments of text_spec if it is text_freetype (or a partial of it) with left justified text."""
+    kwargs = {}
+    while isinstance(text_spec, partial):
+        kwargs = {**text_spec.keywords, **kwargs}
+        text_spec = text_spec.func
+    if text_spec is not gf.components.text_freetype or kwargs.get("justify", "left") != "left" or "layers" in kwargs:
+        return None
+    return kwargs
+
+
+def labelme_batch(
+    c: gf.Component,
+    labels,
+    *,
+    text_spec=gf.components.text_freetype,
+) -> np.ndarray:
+    """
+    Add many text labels to a component at once, see labelme.
+
+    With text_freetype (or a partial of it) as text_spec, the labels are assembled
+    from cached glyph cells (text_glyph) placed directly in c, so every letter is
+    rendered once per font, size and layer. Other text specs are called once per
+    distinct text. All anchor and destination points are computed in one go.
+
+    Args:
+        c: The Component where the labels will exist
+        labels: (c_tolabel, text, position, anchor) entries, with the meaning of the
+            labelme arguments. position and anchor default to "center" if left out.
+        text_spec: Text component specification, default is text_freetype
+
+    Returns:
+        (n, 4) array with the (left, bottom, right, top) bbox of every placed label.
+    """
+    labels = [tuple(label) + ("center", "center")[len(label) - 2:] for label in labels]
+    if not labels:
+        return np.zeros((0, 4))
+    glyph_kwargs = _text_freetype_kwargs(text_spec)
+
+    texts = {}
+    for _, text, _, _ in labels:
+        if text in texts:
+            continue
+        if glyph_kwargs is not None:
+            texts[text] = text_glyph_placements(text, **glyph_kwargs)
+        else:
+            component = text_spec(text=text)
+            box = component.dbbox()
+            texts[text] = (component, np.array([box.left, box.bottom, box.right, box.top]))
+    text_boxes = np.array([texts[text][1] for _, text, _, _ in labels])
+
+    destinations = np.empty((len(labels), 2))
+    for i, (c_tolabel, _, position, _) in enumerate(labels):
+        if callable(position):
+            destinations[i] = position(c_tolabel)
+        elif isinstance(position, str):
+            box = c_tolabel.dbbox()
+            wx, wy = _ANCHOR_WEIGHTS[position]
+            destinations[i] = (box.left + wx * box.width(), box.bottom + wy * box.height())
+        else:
+            destinations[i] = position
+
+    weights = np.array([_ANCHOR_WEIGHTS[anchor] for _, _, _, anchor in labels])
+    anchor_points = text_boxes[:, :2] + weights * (text_boxes[:, 2:] - text_boxes[:, :2])
+    offsets = destinations - anchor_points
+
+    for (_, text, _, _), (dx, dy) in zip(labels, offsets):
+        if glyph_kwargs is not None:
+            for glyph, x, y in texts[text][0]:
+                c.add_ref(glyph).move((x + dx, y + dy))
+        else:
+            c.add_ref(texts[text][0]).move((dx, dy))
+    return text_boxes + np.tile(offsets, 2)
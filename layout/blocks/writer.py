@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import gdsfactory as gf
+
+# GDS record types
+_BGNSTR = 0x05
+_BGNSTR_SIZE = 28  # with its two (zero) timestamps
+_STRNAME = 0x06
+_ENDSTR = b"\x00\x04\x07\x00"
+_ENDLIB = b"\x00\x04\x04\x00"
+
+# layout being written, inherited by forked workers
+_source_layout = None
+
+
+def _save_options(suffix=".gds") -> gf.kdb.SaveLayoutOptions:
+    """Writer options without timestamps or metadata, so equal layouts give equal bytes."""
+    options = gf.kdb.SaveLayoutOptions()
+    options.format = "OASIS" if suffix == ".oas" else "GDS2"
+    options.write_context_info = False
+    options.gds2_write_timestamps = False
+    options.gds2_write_cell_properties = False
+    options.gds2_write_file_properties = False
+    return options
+
+
+def _records(data: bytes, start=0):
+    """(offset, record type) of the GDS records from start on."""
+    offset = start
+    while offset < len(data):
+        length, record_type = struct.unpack_from(">HB", data, offset)
+        yield offset, record_type
+        offset += length
+
+
+def _write_unit(cell_index, layer_index, path, header_size) -> tuple[int, int]:
+    """Writes the instances (layer_index None) or the shapes on layer_index of a cell to path.
+
+    klayout writes the unit from the source layout, with only the cell (and for the
+    instances its children, which come out empty and before it) and the layer
+    selected. Returns the byte range of the cell's elements.
+    """
+    source = _source_layout
+    cell = source.cell(cell_index)
+    options = _save_options()
+    options.select_this_cell(cell_index)
+    options.deselect_all_layers()
+    if layer_index is None:
+        children = sorted(cell.each_child_cell())
+        for child_index in children:
+            options.add_this_cell(child_index)
+    else:
+        children = []
+        options.add_layer(layer_index, source.get_info(layer_index))
+    source.write(str(path), options)
+
+    # header, the empty children (BGNSTR, STRNAME, ENDSTR), then BGNSTR and STRNAME of the cell
+    elements_start = header_size + sum(
+        _BGNSTR_SIZE + len(_structure_name(source.cell(child_index).name)) + len(_ENDSTR) for child_index in children
+    )
+    elements_start += _BGNSTR_SIZE + len(_structure_name(cell.name))
+    return elements_start, Path(path).stat().st_size - len(_ENDSTR) - len(_ENDLIB)
+
+
+def _structure_name(name: str) -> bytes:
+    raw = name.encode()
+    if len(raw) % 2:
+        raw += b"\x00"
+    return struct.pack(">HBB", 4 + len(raw), _STRNAME, 6) + raw
+
+
+def write_oasis(c, path, compression_level=10, cblocks=True, with_metadata=False) -> Path:
+    """Writes c to an OASIS file, flat polygon sets stored as repetitions.
+
+    klayout's OASIS compressor looks for identical shapes on a regular grid (or at
+    arbitrary offsets) and writes each group once with a repetition, so flattened
+    lattices like the output of convert_to_printable or merge_layers_with_priority
+    shrink to about the size of their unit cell. CBLOCKs deflate what is left.
+
+    Args:
+        c: Component to write.
+        path: Output .oas file.
+        compression_level: Repetition search depth, 0 (off) to 10. klayout's default is 2.
+        cblocks: Compress the cells with CBLOCKs.
+        with_metadata: Write ports and info as well.
+    """
+    path = Path(path)
+    layout = c.kcl.layout
+    options = _save_options(".oas")
+    options.oasis_compression_level = compression_level
+    options.oasis_write_cblocks = cblocks
+    options.oasis_strict_mode = True
+    options.write_context_info = with_metadata
+    # only the layers c uses, not every layer ever registered in the layout
+    options.deselect_all_layers()
+    for layer_index in layout.layer_indexes():
+        if not c.kdb_cell.bbox(layer_index).empty():
+            options.add_layer(layer_index, layout.get_info(layer_index))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    c.write_gds(tmp_path, save_options=options, with_metadata=with_metadata)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_sharded(c, gdspath, processes=None) -> Path:
+    """Writes c to a GDS file, serializing the cells in shards in a process pool.
+
+    Every cell is cut into units, its instances and its shapes on each layer, that
+    forked workers write with klayout's writer; the element records are then
+    stitched into one GDS file in the order klayout writes them. The bytes are the
+    same as those of a single klayout write with the same options, whatever the
+    number of processes, so one process (or no fork, e.g. on Windows) just does that.
+    Metadata (ports, info) is not written.
+
+    The workers run klayout's writer, a shape costs the same as in a single write,
+    so this only pays off with several CPUs and many large cells or layers.
+
+    OASIS files can't be stitched, a .oas path is written with write_oasis.
+
+    Args:
+        c: Component to write.
+        gdspath: Output .gds (or .oas) file.
+        processes: Number of worker processes. Defaults to os.cpu_count().
+    """
+    global _source_layout
+    gdspath = Path(gdspath)
+    layout = c.kcl.layout
+    if gdspath.suffix == ".oas":
+        return write_oasis(c, gdspath)
+
+    called = set(c.kdb_cell.called_cells()) | {c.cell_index()}
+    cell_indexes = [cell_index for cell_index in layout.each_cell_bottom_up() if cell_index in called]
+    units = []
+    for cell_index in cell_indexes:
+        cell = layout.cell(cell_index)
+        if cell.child_instances():
+            units.append((cell_index, None))
+        units += [(cell_index, layer_index) for layer_index in layout.layer_indexes() if not cell.shapes(layer_index).is_empty()]
+
+    gdspath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = gdspath.with_name(f"{gdspath.stem}.{os.getpid()}.tmp{gdspath.suffix}")
+    max_workers = min(len(units), processes or os.cpu_count() or 1)
+    if max_workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        options = _save_options()
+        options.select_cell(c.cell_index())
+        layout.write(str(tmp_path), options)
+        os.replace(tmp_path, gdspath)
+        return gdspath
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # header (HEADER, BGNLIB, LIBNAME, UNITS) and BGNSTR as the writer makes them
+        probe = gf.kdb.Layout()
+        probe.dbu = layout.dbu
+        probe.create_cell("probe")
+        probe_path = Path(tmpdir) / "probe.gds"
+        probe.write(str(probe_path), _save_options())
+        probe_data = probe_path.read_bytes()
+        bgnstr = next(offset for offset, record_type in _records(probe_data) if record_type == _BGNSTR)
+        header = probe_data[:bgnstr]
+        bgnstr_record = probe_data[bgnstr : bgnstr + struct.unpack_from(">H", probe_data, bgnstr)[0]]
+
+        paths = [Path(tmpdir) / f"unit_{i}.gds" for i in range(len(units))]
+        cell_args, layer_args = zip(*units)
+        _source_layout = layout
+        try:
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                ranges = list(pool.map(_write_unit, cell_args, layer_args, paths, [len(header)] * len(units)))
+        finally:
+            _source_layout = None
+
+        unit_ranges = iter(zip(units, paths, ranges))
+        unit = next(unit_ranges, None)
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for cell_index in cell_indexes:
+                f.write(bgnstr_record)
+                f.write(_structure_name(layout.cell(cell_index).name))
+                while unit is not None and unit[0][0] == cell_index:
+                    _, path, (start, stop) = unit
+                    with open(path, "rb") as unit_file:
+                        unit_file.seek(start)
+                        f.write(unit_file.read(stop - start))
+                    unit = next(unit_ranges, None)
+                f.write(_ENDSTR)
+            f.write(_ENDLIB)
+        os.replace(tmp_path, gdspath)
+    return gdspath
@@ -1,37 +1,10 @@
-import itertools
 import gdsfactory as gf
 from blocks import *
 
-from gdsfactory.generic_tech import get_generic_pdk
-from gdsfactory.typings import Layer
-from gdsfactory.technology import (
-    LayerMap,
-)
-generic_pdk = get_generic_pdk()
-class NEOMS_LayerMap(LayerMap):
-    WG: Layer = (1, 0)
-    DEEP_ETCH: Layer = (3, 6)
-    SHALLOW_ETCH: Layer = (2, 6)
-    ALD_CORE: Layer = (5, 0)
-    ALD_ETCH_EBL: Layer = (3, 8)
-    ALD_ETCH_PL: Layer = (3, 10)
-    DEEP_ETCH_EBL: Layer = (10,0)
-    DEEP_ETCH_PL: Layer = (9,0)
-    PROTECTION_PL: Layer = (11,0)
-    MTOP: Layer = (12, 24)
-    PADDING: Layer = (67,0)
-    SLAB150: Layer = (2, 0)
-    SLAB90: Layer = (3, 0)
-    FLOORPLAN: Layer = getattr(generic_pdk.layers, "FLOORPLAN")
-    MARKER: Layer = (66, 0)
-pdk1 = gf.Pdk(
-    name="tunable_noems_pdk",
-    layers=NEOMS_LayerMap,
-    cross_sections=generic_pdk.cross_sections,
-    layer_views=generic_pdk.layer_views,
-    cells=generic_pdk.cells,
-)
-pdk1.activate()
+from blocks.pdk import NOEMS_LayerMap, activate_noems_pdk
+
+NEOMS_LayerMap = NOEMS_LayerMap
+pdk1 = activate_noems_pdk()
 
 
 def metal_wire(
@@ -69,10 +42,22 @@ def metal_wire(
     xs = gf.CrossSection(sections=[wg_sec, wire_sec, mask_sec1, mask_sec2],radius=1)
     return xs
 
-def routing_with_mytaper(c, port1:gf.Port, port2:gf.Port, cross_section1, cross_section2,taper_length=20, tangent_offset=0):
+@gf.cell
+def mytaper_transition(cross_section1, cross_section2, taper_length=20, tangent_offset=0):
+    """Straight transition from cross_section1 (shifted by tangent_offset) to cross_section2.
+
+    Cached by gf.cell on (cross_section1, cross_section2, taper_length, tangent_offset),
+    so identical tapers in a fanout are extruded only once.
+    """
     offset_sections = [section.model_copy(update={"offset": section.offset + tangent_offset}) for section in cross_section1.sections]
     cross_section1_cp = cross_section1.copy(sections=offset_sections)
     Xtrans = gf.path.transition(cross_section1=cross_section1_cp, cross_section2=cross_section2, width_type="linear",offset_type="linear")
+    c = gf.Component()
+    trans_ref = c << gf.path.straight(length=taper_length).extrude_transition(transition=Xtrans)
+    c.add_ports(trans_ref.ports)
+    return c
+
+def _mytaper_start_port(port2:gf.Port, taper_length=20, tangent_offset=0):
     p2_moved = port2.copy()
     if port2.orientation == 0:
         p2_moved.center = (p2_moved.center[0]+taper_length, p2_moved.center[1]+tangent_offset)
@@ -82,15 +67,31 @@ def routing_with_mytaper(c, port1:gf.Port, port2:gf.Port, cross_section1, cross_
         p2_moved.center = (p2_moved.center[0]-tangent_offset, p2_moved.center[1]+taper_length)
     elif port2.orientation == 270:
         p2_moved.center = (p2_moved.center[0]+tangent_offset, p2_moved.center[1]-taper_length)
-    
+    return p2_moved
+
+def routing_with_mytaper(c, port1:gf.Port, port2:gf.Port, cross_section1, cross_section2,taper_length=20, tangent_offset=0):
+    p2_moved = _mytaper_start_port(port2, taper_length=taper_length, tangent_offset=tangent_offset)
     route = gf.routing.route_single(c, port1, p2_moved, cross_section=cross_section1, allow_width_mismatch=True, auto_taper=False,start_straight_length=150)
-    trans = gf.path.straight(length=taper_length).extrude_transition(transition=Xtrans)
-    
+    trans = mytaper_transition(cross_section1, cross_section2, taper_length=taper_length, tangent_offset=tangent_offset)
+
     p2_moved.orientation += 180
     trans_ref = c << trans
-    trans_ref.connect(Xtrans.cross_section1.sections[0].port_names[0], p2_moved, allow_type_mismatch=True, allow_width_mismatch=True)
+    trans_ref.connect(cross_section1.sections[0].port_names[0], p2_moved, allow_type_mismatch=True, allow_width_mismatch=True)
     return route
 
+def routing_with_mytaper_batch(c, ports1:list[gf.Port], ports2:list[gf.Port], cross_section1, cross_section2,taper_length=20, tangent_offset=0):
+    """Routes every (ports1[i], ports2[i]) pair with routing_with_mytaper.
+
+    All pairs share one cached transition cell, so a fanout of identical tapers
+    extrudes the taper once and only places references afterwards.
+    """
+    if len(ports1) != len(ports2):
+        raise ValueError("ports1 and ports2 must have the same length")
+    return [
+        routing_with_mytaper(c, port1, port2, cross_section1, cross_section2, taper_length=taper_length, tangent_offset=tangent_offset)
+        for port1, port2 in zip(ports1, ports2)
+    ]
+
 @gf.cell
 def doubly_clamped_beam_with_spring(beam_spec, spring_spec):
     c = gf.Component()
@@ -266,56 +267,11 @@ def beam_test(width=10,length=50):
     return c
 
 def convert_to_printable(c, post_collection_layers=['MTOP','SHALLOW_ETCH']):
-    c2 = gf.Component()
-    # extract the layers of interest into a new component
-    layers = ['DEEP_ETCH', 'PADDING', 'WG','SHALLOW_ETCH', 'PROTECTION_PL','DEEP_ETCH_PL']
-    layers = [gf.get_layer(layer) for layer in layers]
-    
-    c2 << c.extract(layers)
-
-    # get the polygons dictionary and layer keys
-    polys = c2.get_polygons()
-    reg = gf.kdb.Region()
-    
-
-    for layer in layers:
-        reg_layer = gf.kdb.Region(polys.get(layer, []))
-        reg.insert(reg_layer)
-    
-    holes = reg.holes()
-    # filter small holes
-    min_area = 1e6
-    small_holes = gf.kdb.Region()
-    
-    for poly in holes.each():
-        if poly.area() < min_area:
-            small_holes.insert(poly)
-    
-    # 将小面积的 holes 补回 reg 中
-    reg.insert(small_holes)
-    hulls = reg.sized(-3e3,1)
+    """Flattens c into the printable mask layers, see printable_regions.
 
-    # add hulls to a new component if not empty
-    c_output = gf.Component()
-    if not hulls.is_empty():
-        c_output.add_polygon(hulls, layer=("DEEP_ETCH"))
-    c_output.add_polygon(reg, layer=("WG"))
-    
-    bbox = gf.kdb.DPolygon(c_output.bbox()).sized(100)
-    c_output.add_polygon(bbox, layer=(7,0))
-    # DEEPETCH_PL is bbox - DEEP_ETCH + DEEP_ETCH_PL in original component
-    # c_output << gf.boolean(c_output,c_output,"not",'DEEP_ETCH_PL',(7,0),"DEEP_ETCH")
-    DEEPETCH_PL_component = gf.boolean(c_output,c_output,"not",'DEEP_ETCH_PL',(7,0),"DEEP_ETCH")
-    DEEPETCH_PL_component = gf.boolean(DEEPETCH_PL_component, c2, "or", "DEEP_ETCH_PL", "DEEP_ETCH_PL", "DEEP_ETCH_PL")
-    c_output << DEEPETCH_PL_component
-    
-    
-    
-    for layer, polys in c2.get_polygons(layers=['DEEP_ETCH']).items():
-        for poly in polys:
-            c_output.add_polygon(poly,layer=(10,0))
-    c_output << c.extract(post_collection_layers)
-    return c_output
+    incremental_build updates the same layers only where the chip changed.
+    """
+    return printable_component(printable_regions(c), c, post_collection_layers)
 
 @gf.cell
 def ring_resonator_fill_middle(**kwargs):
@@ -404,16 +360,26 @@ def litho_caliper_array(types:list[Literal['EBL', 'PL']], layers, frame_layer='D
         types (list[Literal['EBL', 'PL']]): List of types for the calipers.
         layers (list): List of layers corresponding to the types.
         frame_layer (str, optional): Layer for the frame. Defaults to 'DEEP_ETCH'.
+
+    The calipers are built in parallel, the worker count is set with build_processes.
     """
     c = gf.Component()
     first_type, first_layer = types[0], layers[0]
-    for i, (type2, layer2) in enumerate(zip(types[1:], layers[1:])):
+    caliper_kwargs = []
+    for type2, layer2 in zip(types[1:], layers[1:]):
         if 'PL' in (first_type, type2):
             type_ = 'PL'
         else:
             type_ = 'EBL'
-        caliper = litho_calipers(alignment_type=type_, layer1=first_layer, layer2=layer2)
-        caliper_ref = c << caliper
+        caliper_kwargs.append(dict(alignment_type=type_, layer1=first_layer, layer2=layer2))
+    # build every distinct caliper once
+    unique_kwargs = list({repr(sorted(kwargs.items())): kwargs for kwargs in caliper_kwargs}.values())
+    calipers = dict(zip(
+        (repr(sorted(kwargs.items())) for kwargs in unique_kwargs),
+        build_components(litho_calipers, unique_kwargs),
+    ))
+    for i, kwargs in enumerate(caliper_kwargs):
+        caliper_ref = c << calipers[repr(sorted(kwargs.items()))]
         caliper_ref.move((i%4 * 200, i//4 * -200))
     c2 = gf.Component()
     c2 << gf.components.add_frame(c, width=2, layer=frame_layer)
@@ -655,15 +621,13 @@ def combdrive_fingers_5um(finger_length:float=20.0, finger_width:float=2, finger
     finger_single.add_polygon(round_corner_poly, layer='WG')
     finger_single.flatten()
     
-    for i in range(pair_num):
-        finger_l = c << finger_single
-        finger_l.movey(2*i*(finger_width + finger_gap))
-        finger_r = c << finger_single
+    # left bank: pair_num + 1 fingers, right bank: pair_num mirrored fingers in between
+    pitch = 2*(finger_width + finger_gap)
+    c.add_ref(finger_single, rows=pair_num + 1, row_pitch=pitch)
+    if pair_num > 0:
+        finger_r = c.add_ref(finger_single, rows=pair_num, row_pitch=pitch)
         finger_r.mirror()
         finger_r.movex(2*finger_length - overlap).movey(finger_gap+finger_width)
-        finger_r.movey(2*i*(finger_width + finger_gap))
-    finger_l = c << finger_single
-    finger_l.movey(2*pair_num*(finger_width + finger_gap))
     c.move(origin=c.center, destination=(0,0))
     c.add_port(name='w1', center=(c.xmin, 0), orientation=180,width=finger_width,layer='WG',port_type='placement')
     c.add_port(name='e1', center=(c.xmax, 0), orientation=0,width=finger_width,layer='WG',port_type='placement')
@@ -671,14 +635,54 @@ def combdrive_fingers_5um(finger_length:float=20.0, finger_width:float=2, finger
     c.info['total_width'] = c.xsize
     return c
 
+def combdrive_fingers_5um_size(finger_length:float=20.0, finger_width:float=2, finger_gap:float=2, overlap=2, pair_num=20, round_corner=1) -> tuple[float, float]:
+    """(xsize, ysize) of combdrive_fingers_5um without building it."""
+    xmin = min(0, finger_length - overlap - round_corner) if pair_num > 0 else 0
+    xmax = max(2*finger_length - overlap, finger_length + round_corner) if pair_num > 0 else finger_length + round_corner
+    return xmax - xmin, (2*pair_num + 1)*finger_width + 2*pair_num*finger_gap
+
+def combdrive_array_size(finger_size, movable_base_width, fixed_base_width, mask_offset=10) -> dict:
+    """Dimensions of combdrive_array without building any geometry, for floorplanning.
+
+    Args:
+        finger_size: (xsize, ysize) of the finger bank, or anything with xsize and ysize
+            (e.g. an already built finger component). Assumes w1/e1 ports on the bank's
+            left/right edges at its vertical center, like the finger generators here.
+        movable_base_width: as in combdrive_array.
+        fixed_base_width: as in combdrive_array.
+        mask_offset: as in combdrive_array.
+
+    Returns:
+        dict with base_length, total_width and total_height (the info of combdrive_array)
+        and footprint, the size including the deep etch mask.
+    """
+    if hasattr(finger_size, 'xsize'):
+        finger_size = (finger_size.xsize, finger_size.ysize)
+    finger_xsize, finger_ysize = finger_size
+    base_length = finger_ysize + 30
+    total_width = movable_base_width + finger_xsize + fixed_base_width
+    total_height = base_length + 20  # bases are shifted by -10/+10
+    return dict(
+        base_length=base_length,
+        total_width=total_width,
+        total_height=total_height,
+        footprint=(total_width + 2*mask_offset, total_height + 2*mask_offset),
+    )
+
 @gf.cell
 def combdrive_array(finger_spec, movable_base_width, fixed_base_width, mask_offset=10) -> gf.Component:
+    """Finger bank between a perforated movable base and a solid fixed base.
+
+    finger_spec can be a component function or an already built component; it is
+    built only once. Use combdrive_array_size to get the dimensions without geometry.
+    """
     c = gf.Component()
     
-    base_length = finger_spec().ysize + 30  # ensure base is longer than finger
+    finger = gf.get_component(finger_spec)
+    base_length = finger.ysize + 30  # ensure base is longer than finger
     movable_base = perforated_shaft(width=movable_base_width, height=base_length,brick_mode=1,hole_size=(5,10), margin=5,create_mask=False)
     movable_base_ref = c.add_ref(movable_base)
-    finger_ref = c.add_ref(finger_spec())
+    finger_ref = c.add_ref(finger)
     movable_base_ref.connect('e1', finger_ref.ports['w1'],allow_layer_mismatch=True,allow_width_mismatch=True,allow_type_mismatch=True)
     movable_base_ref.movey(-10)
     
@@ -691,6 +695,7 @@ def combdrive_array(finger_spec, movable_base_width, fixed_base_width, mask_offs
     c.add_port(name='f', port=fixed_base_ref.ports['e2'])
     
     c.info['total_height'] = c.ysize
+    c.info['total_width'] = c.xsize
     
     create_deep_etch_mask(c, 'bbox', deep_etch_layer='DEEP_ETCH_PL', mask_offset=mask_offset)
     
@@ -766,29 +771,48 @@ def EBL_PL_overlap(c:gf.Component, overlap:float=3, EBL_layer="DEEP_ETCH", PL_la
     EBL_sized = EBL_reg.sized(-overlap*1000,2)
     
     c_out.add_polygon(PL_reg-EBL_sized, PL_layer)
-    c_out.add_ref(c.extract(layers=[l for l in c.layers if gf.get_layer(l) != gf.get_layer(PL_layer)]))
+    c_out.add_ref(c.extract(layers=[l for l in c.layers if noems_layer(l) != noems_layer(PL_layer)]))
     
     c_out.ports = c.ports
     return c_out
 
 @gf.cell
 def cantilever_pullin_array():
+    """Sweep of cantilever_pullin_test, the worker count is set with build_processes."""
     length_list = [15, 30]
     overlap_list = [10, 15]
     thick_list = np.array([100, 300]) * 1e-3
-
-    # Generate all combinations of the parameters
-    param_combinations = list(itertools.product( overlap_list, thick_list,length_list,))
     gap = 1
-    c = gf.Component()
 
-    text_spec = partial(gf.components.text_freetype, font="Arial", size=50, layer="MTOP")
-    for i, (overlap,t, l) in enumerate(param_combinations):
-        inst = c << cantilever_pullin_test(width=t, length=l, gap=gap, overlap=overlap)
-        row = i // 2
-        col = i % 2
-        inst.movey(row * 600)
-        inst.movex(col * 1500)
-        
-        labelme(c, inst, f"overlap={overlap}um, t={t*1e3}nm, l={l}nm", position=lambda c_ref: (c_ref.xmin, c_ref.ymin-20), anchor="NW", text_spec=text_spec)
-    return c
\ No newline at end of file
+    c, _ = parameter_sweep(
+        cantilever_pullin_test,
+        dict(overlap=overlap_list, width=list(thick_list), length=length_list),
+        fixed=dict(gap=gap),
+        pitch=(1500, 600),
+        label=lambda p: f"overlap={p['overlap']}um, t={p['width']*1e3}nm, l={p['length']}nm",
+        text_spec=partial(gf.components.text_freetype, font="Arial", size=50, layer="MTOP"),
+    )
+    return c
+
+register_snapshot("spring_5um", spring_5um, spring_width=2, spring_length=100, separation=15, num_loops=3, mask_offset=10)
+register_snapshot(
+    "folded_spring_5um",
+    folded_spring_5um,
+    length=100,
+    width=2,
+    separation=15,
+    anchor_size=50,
+    flying_bar_height=15,
+    shaft_hole_size=(20, 2),
+    shaft_margin=10,
+    mask_offset=10,
+)
+register_snapshot("combdrive_fingers_5um", combdrive_fingers_5um, finger_length=20, pair_num=50, overlap=5)
+register_snapshot(
+    "combdrive_array",
+    combdrive_array,
+    finger_spec=partial(combdrive_fingers_5um, finger_length=20, pair_num=50, overlap=5),
+    movable_base_width=10,
+    fixed_base_width=30,
+    mask_offset=10,
+)
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the layout directory holds blocks and comb_drive_tuning, which import each other by top-level name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def noems_pdk():
+    from blocks.pdk import activate_noems_pdk
+
+    return activate_noems_pdk()
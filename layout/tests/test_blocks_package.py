@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+LAYOUT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _run(code):
+    # a fresh interpreter, the session has loaded every submodule already
+    return subprocess.run([sys.executable, "-c", code], cwd=LAYOUT_DIR, capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize("name", ["truss", "floorplan", "cell_cache"])
+def test_submodule_import_keeps_shadowing_function(name):
+    _run(
+        f"import inspect, sys, blocks.{name}\n"
+        f"from blocks import {name}\n"
+        f"import blocks\n"
+        f"assert inspect.isfunction({name}), {name}\n"
+        f"assert blocks.{name} is {name}\n"
+        f"assert sys.modules['blocks.{name}'].{name} is {name}\n"
+    )
+
+
+def test_local_modules_keep_shadowing_functions():
+    _run(
+        "import inspect\n"
+        "from blocks.cell_cache import _local_modules\n"
+        "_local_modules()\n"
+        "from blocks import cell_cache, floorplan, truss\n"
+        "assert all(inspect.isfunction(f) for f in (cell_cache, floorplan, truss))\n"
+    )
+
+
+def test_exports_match_the_modules():
+    import importlib
+
+    import blocks
+
+    # what `from .<module> import *` of every module in order binds on the package
+    expected = {}
+    for module in blocks._MODULES:
+        namespace = vars(importlib.import_module(f"blocks.{module}"))
+        # pytest's assertion rewriting adds @py_ names to blocks.test_blocks
+        public = {name: value for name, value in namespace.items() if name.isidentifier() and not name.startswith("_")}
+        expected.update(public)
+    assert set(blocks._NAMES) == set(expected)
+    missing = object()
+    for name, module in blocks._NAMES.items():
+        assert getattr(importlib.import_module(f"blocks.{module}"), name) is expected[name], name
+        # listed under the first module binding it
+        for earlier in blocks._MODULES[: blocks._MODULES.index(module)]:
+            assert vars(importlib.import_module(f"blocks.{earlier}")).get(name, missing) is not expected[name], name
+    # a name shadowing a submodule comes from that submodule
+    assert all(blocks._NAMES[name] == name for name in set(blocks._NAMES) & set(blocks._MODULES))
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from pathlib import Path
+
+LAYOUT_DIR = Path(__file__).resolve().parent.parent
+
+_COMBDRIVE_SESSION = """
+import sys
+import gdsfactory as gf
+from blocks.cell_cache import persistent_cell
+from comb_drive_tuning import combdrive_array
+
+fingers = gf.Component()
+fingers.add_polygon([(0, -10), ({length}, -10), ({length}, 10), (0, 10)], layer="WG")
+fingers.add_port(name="w1", center=(0, 0), orientation=180, width=2, layer="WG", port_type="placement")
+fingers.add_port(name="e1", center=({length}, 0), orientation=0, width=2, layer="WG", port_type="placement")
+c = persistent_cell(combdrive_array, cache_dir=sys.argv[1])(fingers, movable_base_width=10, fixed_base_width=30)
+print(c.info["total_width"])
+"""
+
+
+def _session(code, *args):
+    # a fresh interpreter per session, anonymous components are numbered per process
+    result = subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=LAYOUT_DIR, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def test_anonymous_component_argument_across_sessions(tmp_path):
+    # both finger banks are Unnamed_0 in their session
+    assert float(_session(_COMBDRIVE_SESSION.format(length=20), str(tmp_path))) == 60
+    assert float(_session(_COMBDRIVE_SESSION.format(length=40), str(tmp_path))) == 80
+    # the same geometry again is a hit
+    assert float(_session(_COMBDRIVE_SESSION.format(length=40), str(tmp_path))) == 80
+    assert len(list(tmp_path.rglob("*.gds"))) == 2
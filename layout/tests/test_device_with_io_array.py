@@ -0,0 +1,47 @@
+from functools import partial
+
+import gdsfactory as gf
+import pytest
+
+from blocks.cross_section import cross_section_with_sleeves
+from blocks.test_blocks import device_with_io_array, grating_coupler_test_block
+from blocks.mylib import waveguide_inv_extrude
+
+
+def _xs():
+    return cross_section_with_sleeves(core_width=0.43, total_width=5, radius=50, radius_min=10)
+
+
+def _wg_areas(c):
+    """(sum of the polygon areas, merged area) on WG, equal if no waveguides overlap."""
+    region = gf.kdb.Region(c.kdb_cell.begin_shapes_rec(gf.get_layer("WG")))
+    return sum(polygon.area() for polygon in region.each()), region.merged().area()
+
+
+@pytest.mark.parametrize("route_mode", ["single", "bundle"])
+def test_grating_coupler_test_block_routes_do_not_overlap(route_mode):
+    xs = _xs()
+    gc = partial(gf.components.grating_coupler_elliptical, cross_section=xs)
+    c = grating_coupler_test_block(gc, xs, route_mode=route_mode)
+    raw, merged = _wg_areas(c)
+    assert raw == merged
+    for route in c.info["routing_report"]:
+        (x1, y1), (x2, y2) = route["start"], route["end"]
+        if y1 == y2:
+            # no lateral offset: a straight run from coupler to device
+            assert route["n_bend90"] == 0
+            assert route["length"] == pytest.approx(abs(x2 - x1))
+        else:
+            assert route["n_bend90"] == 2
+
+
+def test_bundle_fan_does_not_overlap():
+    xs = _xs()
+    gc = partial(gf.components.grating_coupler_elliptical, cross_section=xs)
+    wg = partial(waveguide_inv_extrude, width=0.43, length=50, total_width=10, sleeve_layer="DEEP_ETCH", core_layer="WG")
+    # devices lifted further the higher they sit, the routes form two bundles
+    placements = tuple((3000, 300 + 12 * i, (0, 30 * i)) for i in range(8))
+    c = device_with_io_array(wg, gc, xs, placements, route_mode="bundle")
+    raw, merged = _wg_areas(c)
+    assert raw == merged
+    assert len(c.info["routing_report"]) == 16
@@ -0,0 +1,116 @@
+import gdsfactory as gf
+import numpy as np
+import pytest
+
+from blocks import (
+    EPSILON_0,
+    combdrive_estimate,
+    combdrive_fingers,
+    component_mass,
+    folded_spring_5um_stiffness,
+    guided_beam_stiffness,
+    resonance_frequency,
+    spring_5um_stiffness,
+    spring_anchor_outside,
+    spring_anchor_outside_stiffness,
+    spring_estimate,
+)
+from comb_drive_tuning import combdrive_fingers_5um, folded_spring_5um, spring_5um
+
+
+def _region(c, layer="WG"):
+    return gf.kdb.Region(c.begin_shapes_rec(gf.get_layer(layer))).merged()
+
+
+def _beams(c, width, length):
+    """(dx, dy) in um of the sidewalls of the beams of width in c, longer than length / 2."""
+    dbu = c.kcl.dbu
+    w = round(width / dbu)
+    pairs = _region(c).width_check(w + 1, False, gf.kdb.Metrics.Projection)
+    edges = [pair.first for pair in pairs if pair.distance() == w and pair.first.length() * dbu > length / 2]
+    return [(abs(edge.dx()) * dbu, abs(edge.dy()) * dbu) for edge in edges]
+
+
+def test_guided_beam_stiffness_by_hand():
+    # E t w^3 / L^3 and E t w / L for w = 2, L = 100, t = 5 um
+    k_bending, k_axial = guided_beam_stiffness(2, 100, 5)
+    assert k_bending == pytest.approx(169e9 * 5e-6 * 8e-18 / 1e-12)
+    assert k_bending == pytest.approx(6.76)
+    assert k_axial == pytest.approx(16900)
+
+
+def test_spring_anchor_outside_stiffness():
+    beams = _beams(spring_anchor_outside(spring_width=0.3, spring_length=20), 0.3, 20)
+    # four parallel beams along y, the shuttle frame covers the end of one
+    assert beams == [(0, pytest.approx(20, abs=0.1))] * 4
+    k_bending, k_axial = guided_beam_stiffness(0.3, 20, 5)
+    stiffness = spring_anchor_outside_stiffness(0.3, 20, 5)
+    assert stiffness["k_x"] == pytest.approx(4 * k_bending)
+    assert stiffness["k_y"] == pytest.approx(4 * k_axial)
+
+
+@pytest.mark.parametrize("num_loops", [1, 3])
+def test_spring_5um_stiffness(num_loops):
+    c = spring_5um(spring_width=1, spring_length=100, separation=15, num_loops=num_loops)
+    # 2*num_loops + 1 beams along y in series, from p1 to p2
+    assert _beams(c, 1, 100) == [(0, pytest.approx(100))] * (2 * num_loops + 1)
+    assert sorted(port.orientation for port in c.ports) == [90, 270]
+    k_bending, k_axial = guided_beam_stiffness(1, 100, 5)
+    stiffness = spring_5um_stiffness(1, 100, num_loops, 5)
+    assert stiffness["k_x"] == pytest.approx(k_bending / (2 * num_loops + 1))
+    assert stiffness["k_y"] == pytest.approx(k_axial / (2 * num_loops + 1))
+    assert stiffness["k_y"] / stiffness["k_x"] == pytest.approx(100**2)
+
+
+def test_folded_spring_5um_stiffness():
+    c = folded_spring_5um(
+        length=100, width=1, separation=15, anchor_size=50, flying_bar_height=15, shaft_hole_size=(20, 2), shaft_margin=10
+    )
+    # two pairs of parallel beams along y in series: 2k in series with 2k is k
+    assert _beams(c, 1, 100) == [(0, pytest.approx(100))] * 4
+    k_bending, k_axial = guided_beam_stiffness(1, 100, 5)
+    stiffness = folded_spring_5um_stiffness(1, 100, 5)
+    assert stiffness["k_x"] == pytest.approx(k_bending)
+    assert stiffness["k_y"] == pytest.approx(k_axial)
+
+
+def test_combdrive_estimate_against_combdrive_fingers():
+    fingers, finger_length, finger_gap, a_c, thickness = 6, 20, 2, 3, 5
+    c = combdrive_fingers(fingers=fingers, finger_length=finger_length, finger_gap=finger_gap, a_c=a_c, thickness=thickness)
+    # facing sidewalls finger_gap apart
+    gap = round(finger_gap / c.kcl.dbu)
+    pairs = _region(c).space_check(gap + 1, False, gf.kdb.Metrics.Projection)
+    sidewall = sum(pair.first.length() for pair in pairs if pair.distance() == gap) * c.kcl.dbu
+    assert sidewall == pytest.approx((fingers - 1) * (finger_length - a_c))
+
+    estimate = combdrive_estimate(finger_gap, 5, voltage=10, fingers=fingers, finger_length=finger_length, a_c=a_c)
+    capacitance = EPSILON_0 * sidewall * 1e-6 * 5e-6 / (finger_gap * 1e-6)
+    assert estimate["capacitance"] == pytest.approx(capacitance)
+    assert estimate["dC_dx"] == pytest.approx(capacitance / ((finger_length - a_c) * 1e-6))
+    assert estimate["force"] == pytest.approx(0.5 * estimate["dC_dx"] * 100)
+
+
+def test_combdrive_estimate_pair_num():
+    c = combdrive_fingers_5um(pair_num=4)
+    assert _region(c).count() == 2 * 4 + 1
+    by_pairs = combdrive_estimate(2, 5, voltage=3, pair_num=4, overlap=10)
+    by_fingers = combdrive_estimate(2, 5, voltage=3, fingers=9, overlap=10)
+    assert by_pairs == pytest.approx(by_fingers)
+    with pytest.raises(ValueError):
+        combdrive_estimate(2, 5, fingers=9, pair_num=4, overlap=10)
+
+
+def test_combdrive_estimate_broadcasts():
+    estimate = combdrive_estimate(np.array([1.0, 2.0])[:, None], 5, fingers=np.array([3, 5, 7]), overlap=10)
+    assert estimate["capacitance"].shape == (2, 3)
+    assert estimate["capacitance"][0, 0] == pytest.approx(2 * estimate["capacitance"][1, 0])
+
+
+def test_mass_and_resonance():
+    c = gf.components.rectangle(size=(10, 20), layer="WG")
+    # 200 um^2 x 5 um of silicon
+    mass = component_mass(c, 5)
+    assert mass == pytest.approx(200e-12 * 5e-6 * 2329)
+    assert resonance_frequency(4 * np.pi**2, 1) == pytest.approx(1)
+    estimate = spring_estimate(dict(k_x=4 * np.pi**2 * mass, k_y=16 * np.pi**2 * mass), mass)
+    assert (estimate["f_x"], estimate["f_y"]) == (pytest.approx(1), pytest.approx(2))
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+LAYOUT_DIR = Path(__file__).resolve().parent.parent
+
+_BUILD_SESSION = """
+import json
+import sys
+import gdsfactory as gf
+from blocks import activate_noems_pdk, build_components, geometry_hash, text_outline
+
+activate_noems_pdk()
+font = str(gf.config.PATH.font_ocr)
+kwargs_list = [
+    dict(text="spacing = 8\\noffset= 0.1", font=font, size=10),
+    dict(text="B8 = A", font=font, size=15, outline_width=2),
+    dict(text="8", font=font, size=14),
+]
+components = build_components(text_outline, kwargs_list, processes=int(sys.argv[1]))
+print(json.dumps([geometry_hash(c) for c in components]))
+"""
+
+
+def _build(processes):
+    # a fresh interpreter per build, build_components reuses cells already in the layout
+    result = subprocess.run(
+        [sys.executable, "-c", _BUILD_SESSION, str(processes)], cwd=LAYOUT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_build_components_serial_and_parallel_agree():
+    # outlines with holes, one of them merged over two lines
+    assert _build(2) == _build(1)
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+LAYOUT_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_snapshots_match_in_a_fresh_process():
+    # no PDK activated and comb_drive_tuning not imported beforehand
+    result = subprocess.run(
+        [sys.executable, "-c", "from blocks.snapshots import check_snapshots\nprint(check_snapshots(cache=None))"],
+        cwd=LAYOUT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "{}"
+
+
+def test_snapshots_cover_comb_drive_tuning():
+    from blocks.snapshots import SNAPSHOT_CASES, snapshot_hashes
+
+    snapshot_hashes(["truss"], cache=None)
+    assert {"spring_5um", "folded_spring_5um", "combdrive_fingers_5um", "combdrive_array"} <= set(SNAPSHOT_CASES)
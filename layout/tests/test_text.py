@@ -0,0 +1,39 @@
+import gdsfactory as gf
+import pytest
+
+from blocks import text_outline
+
+OCR = str(gf.config.PATH.font_ocr)
+
+
+def _region(c, layer):
+    return gf.kdb.Region(c.begin_shapes_rec(gf.get_layer(layer))).merged()
+
+
+def _reference_outline(text, font, size, layer, outline_width):
+    """text_freetype with every polygon sized by outline_width, minus the text."""
+    text_c = gf.components.text_freetype(text, size=size - 1, font=font, layer=layer)
+    sized = gf.Component()
+    for polygon in text_c.get_polygons()[gf.get_layer(layer)]:
+        sized.add_polygon(polygon.sized(round(outline_width / sized.kcl.dbu)), layer=layer)
+    return _region(sized, layer) - _region(text_c, layer)
+
+
+@pytest.mark.parametrize(
+    "text, font, size, outline_width",
+    [
+        ("Ag8", OCR, 10, 1),
+        ("spacing = 8\noffset= 0.1", OCR, 12, 1),
+        # the outlines reach into the neighbouring letters, the text is merged
+        ("WM", OCR, 10, 3),
+        ("1.5 um\n(x)", "DEPLOF", 10, 1),
+    ],
+)
+def test_text_outline_matches_text_freetype(text, font, size, outline_width):
+    c = text_outline(text, font=font, size=size, layer="DEEP_ETCH", outline_width=outline_width, with_mask=False)
+    outline = _region(c, "DEEP_ETCH")
+    reference = _reference_outline(text, font, size, "DEEP_ETCH", outline_width)
+    assert not outline.is_empty()
+    # each within 1 dbu of the other
+    assert (outline - reference.sized(1)).is_empty()
+    assert (reference - outline.sized(1)).is_empty()
@@ -0,0 +1,56 @@
+import time
+
+import gdsfactory as gf
+import pytest
+
+from blocks import spring_pair, truss_v2
+from blocks.writer import _save_options, write_sharded
+
+
+def _hierarchy():
+    c = gf.Component()
+    c << spring_pair()
+    c.add_ref(truss_v2(width=0.5, size=5, mxn=(3, 4)), columns=3, rows=2, column_pitch=50, row_pitch=50)
+    c.add_label("label", position=(3, 4), layer="MTOP")
+    c.add_polygon([(0, 0), (3, 0), (0, 3)], layer=(77, 3))
+    return c
+
+
+def _flat(n):
+    c = gf.Component()
+    for layer in ("WG", "DEEP_ETCH"):
+        shapes = c.kdb_cell.shapes(gf.get_layer(layer))
+        for i in range(n):
+            x, y = (i % 500) * 2000, (i // 500) * 2000
+            shapes.insert(gf.kdb.Polygon([gf.kdb.Point(x, y), gf.kdb.Point(x + 1000 + i % 7, y), gf.kdb.Point(x, y + 1000)]))
+    return c
+
+
+def _best_of(n, func):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.parametrize("processes", [1, 2, 3])
+def test_write_sharded_matches_a_single_write(tmp_path, processes):
+    c = _hierarchy()
+    options = _save_options()
+    options.select_cell(c.cell_index())
+    c.kcl.layout.write(str(tmp_path / "native.gds"), options)
+    path = write_sharded(c, tmp_path / "sharded.gds", processes=processes)
+    assert path.read_bytes() == (tmp_path / "native.gds").read_bytes()
+
+
+def test_write_sharded_benchmark(tmp_path):
+    c = _flat(100_000)
+    reference = _best_of(3, lambda: c.write_gds(tmp_path / "reference.gds"))
+    serial = _best_of(3, lambda: write_sharded(c, tmp_path / "serial.gds", processes=1))
+    forked = _best_of(3, lambda: write_sharded(c, tmp_path / "forked.gds", processes=2))
+    print(f"write_gds {reference:.3f} s, write_sharded 1 process {serial:.3f} s, 2 processes {forked:.3f} s")
+    # one process is klayout's write, the forked workers add at most the stitching
+    assert serial < 1.5 * reference + 0.05
+    assert forked < 3 * reference + 0.3